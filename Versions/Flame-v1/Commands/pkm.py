@@ -1,6 +1,7 @@
 # FlameShell package manager (PKM)
 # Allows installing commands from GitHub to Installed/
 import os, sys, subprocess
+import json
 import os
 import re
 import sys
@@ -149,6 +150,42 @@ def install_zip_pack(name: str):
         print_error(f"zip extraction failed: {e}", 3)
         return False
 
+INDEX_CACHE = INSTALL_DIR / ".index.json"
+INDEX_TTL = 3600
+
+def load_index():
+    # index.json is kept next to the installed commands for an hour so
+    # installing doesn't cost an extra request every time.
+    try:
+        if time.time() - INDEX_CACHE.stat().st_mtime < INDEX_TTL:
+            return json.loads(INDEX_CACHE.read_text())
+    except (OSError, ValueError):
+        pass
+    try:
+        r = requests.get(GITHUB_BASE + "index.json", timeout=10)
+        if r.status_code != 200:
+            return None
+        data = r.json()
+    except (requests.RequestException, ValueError):
+        return None
+    try:
+        INSTALL_DIR.mkdir(exist_ok=True)
+        INDEX_CACHE.write_text(json.dumps(data))
+    except OSError:
+        pass
+    return data
+
+def lookup_type(name: str):
+    # index.json says whether a command is a .py or a .zip pack, so install
+    # only needs one download. Returns None if the index can't be read.
+    index = load_index()
+    if index is None:
+        return None
+    entry = index.get("packages", {}).get(name)
+    if entry is None:
+        return None
+    return entry.get("type", "file")
+
 def install_command(name: str):
     py_path = INSTALL_DIR / (name + ".py")
     zip_path = INSTALL_DIR / name
@@ -157,7 +194,11 @@ def install_command(name: str):
         print("command already installed, use: pkm update <name>")
         return
 
-    if install_single_py(name):
+    kind = lookup_type(name)
+    if kind == "zip":
+        install_zip_pack(name)
+        return
+    if install_single_py(name) or kind == "file":
         return
 
     print("trying .zip instead")
@@ -1,10 +1,13 @@
 #!/usr/bin/env python3
-import os, subprocess, readline, importlib, importlib.util
+import os, subprocess, readline, importlib, importlib.util, shutil
 from pathlib import Path
 
 COMMAND_FOLDER = Path(__file__).parent / "Commands"
 INSTALLED_FOLDER = Path(__file__).parent / "Installed"
+HISTORY_FILE = Path(__file__).parent / ".flame_history"
+HISTORY_LIMIT = 10000
 COMMANDS = {}
+PATH_CACHE = {}
 
 def load_commands():
     for file in os.listdir(COMMAND_FOLDER):
@@ -40,6 +43,38 @@ def setup_autocomplete():
     readline.set_completer(comp)
     readline.parse_and_bind("tab: complete")
 
+def setup_history():
+    # history survives pkm's os.execv restarts: each line is appended as it is
+    # entered and the file is trimmed back to HISTORY_LIMIT on startup
+    HISTORY_FILE.touch(exist_ok=True)
+    try:
+        readline.read_history_file(HISTORY_FILE)
+    except OSError as e:
+        print(f"[HISTORY ERROR] {e}")
+    readline.set_history_length(HISTORY_LIMIT)
+    if readline.get_current_history_length() > HISTORY_LIMIT:
+        readline.write_history_file(HISTORY_FILE)
+
+def save_history_line():
+    try:
+        readline.append_history_file(1, HISTORY_FILE)
+    except OSError:
+        pass
+
+def find_executable(cmd):
+    # cached PATH lookup, dropped whenever PATH itself changes
+    path_value = os.environ.get("PATH", os.defpath)
+    if PATH_CACHE.get("") != path_value:
+        PATH_CACHE.clear()
+        PATH_CACHE[""] = path_value
+    exe = PATH_CACHE.get(cmd)
+    if exe and os.access(exe, os.X_OK):
+        return exe
+    exe = shutil.which(cmd)
+    if exe:
+        PATH_CACHE[cmd] = exe
+    return exe
+
 def make_prompt():
     cwd = os.getcwd().replace(str(Path.home()), "~")
     return f"\033[38;5;208mflame\033[0m:\033[38;5;39m{cwd}\033[0m $ "
@@ -48,6 +83,7 @@ def main():
     load_commands()
     load_installed()
     setup_autocomplete()
+    setup_history()
 
     while True:
         try:
@@ -58,6 +94,7 @@ def main():
 
         if not line:
             continue
+        save_history_line()
 
         parts = line.split()
         cmd, args = parts[0], parts[1:]
@@ -70,7 +107,23 @@ def main():
 
             continue
 
-        print(f"{cmd}: command not found (FlameShell only)")
+        exe = find_executable(cmd)
+        if exe:
+            try:
+                proc = subprocess.Popen([cmd, *args], executable=exe)
+                # Ctrl-C belongs to the child (python, less, top...): keep
+                # waiting until it decides to exit.
+                while True:
+                    try:
+                        proc.wait()
+                        break
+                    except KeyboardInterrupt:
+                        print()
+            except OSError as e:
+                print(f"[CMD ERROR] {cmd}: {e}")
+            continue
+
+        print(f"{cmd}: command not found")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,59 @@
+"""Benchmarks for CommandRegistry, FlameTerminal.execute_line and the completer."""
+import contextlib
+import os
+import tempfile
+from typing import List
+
+from Benchmarks.harness import Result, measure
+
+SUITE = "core"
+COMMAND_SOURCE = "def run(args):\n    return len(args)\n"
+
+
+def build_tree(root: str, size: int) -> List[str]:
+    """Create Commands/ with `size` commands and Installed/ with a tenth as many."""
+    directories = [os.path.join(root, "Commands"), os.path.join(root, "Installed")]
+    for directory in directories:
+        os.makedirs(directory, exist_ok=True)
+    for index in range(size):
+        with open(os.path.join(directories[0], f"cmd_{index:05d}.py"), "w", encoding="utf-8") as handle:
+            handle.write(COMMAND_SOURCE)
+    for index in range(max(1, size // 10)):
+        with open(os.path.join(directories[1], f"plugin_{index:05d}.py"), "w", encoding="utf-8") as handle:
+            handle.write(COMMAND_SOURCE)
+    return directories
+
+
+def run(sizes: List[int], budget: float) -> List[Result]:
+    import Terminal
+
+    results: List[Result] = []
+    original_cwd = os.getcwd()
+    with open(os.devnull, "w") as devnull, tempfile.TemporaryDirectory(prefix="flame-bench-") as root:
+        try:
+            for size in sizes:
+                tree = os.path.join(root, str(size))
+                registry = Terminal.CommandRegistry(build_tree(tree, size))
+                terminal = Terminal.FlameTerminal(registry=registry)
+                target = f"cmd_{size // 2:05d}"
+
+                results.append(measure(SUITE, "registry.refresh", size, registry.refresh, budget))
+                results.append(measure(SUITE, "registry.load", size, lambda: registry.load(target), budget))
+                with contextlib.redirect_stdout(devnull):
+                    results.append(
+                        measure(SUITE, "execute_line", size, lambda: terminal.execute_line(f"{target} a b c"), budget)
+                    )
+                results.append(measure(SUITE, "completer.first", size, lambda: terminal._completer("cmd_0", 0), budget))
+                results.append(
+                    measure(SUITE, "completer.cycle", size, lambda: _cycle_completer(terminal, "plugin_"), budget)
+                )
+        finally:
+            os.chdir(original_cwd)
+    return results
+
+
+def _cycle_completer(terminal, text: str) -> None:
+    # readline asks for state 0, 1, 2, ... until the completer returns None.
+    state = 0
+    while terminal._completer(text, state) is not None:
+        state += 1
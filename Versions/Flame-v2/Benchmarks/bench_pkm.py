@@ -0,0 +1,90 @@
+"""pkm download/install benchmarks against a local http.server stand-in.
+
+The server lays files out like raw.githubusercontent.com
+(`/<owner>/<repo>/<branch>/FlameCommands/<item>`) and pkm is pointed at it
+through FLAME_V2_PKM_URL, so no network access is needed.
+"""
+import contextlib
+import importlib.util
+import os
+import shutil
+import tempfile
+import threading
+import zipfile
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+from Benchmarks.harness import Result, measure
+
+SUITE = "pkm"
+REPO = "bench/flame"
+BRANCH = "main"
+LARGE_PAYLOAD = 8 * 1024 * 1024
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):  # noqa: A002 - signature from BaseHTTPRequestHandler
+        pass
+
+
+def _publish(serve_root: str, pack_sizes: List[int]) -> str:
+    commands_dir = os.path.join(serve_root, REPO, BRANCH, "FlameCommands")
+    os.makedirs(commands_dir)
+    published = os.path.join(REPO_ROOT, "FlameCommands")
+    for entry in os.listdir(published):
+        if not os.path.isfile(os.path.join(published, entry)):
+            continue
+        shutil.copyfile(os.path.join(published, entry), os.path.join(commands_dir, entry))
+    for size in pack_sizes:
+        with zipfile.ZipFile(os.path.join(commands_dir, f"pack{size}.zip"), "w") as archive:
+            for index in range(size):
+                archive.writestr(f"pack{size}_{index:05d}.py", "def run(args):\n    return None\n")
+    with open(os.path.join(commands_dir, "large.bin"), "wb") as handle:
+        handle.write(os.urandom(LARGE_PAYLOAD))
+    return commands_dir
+
+
+def _load_pkm(home: str, base_url: str):
+    os.environ["FLAME_V2_HOME"] = home
+    os.environ["FLAME_V2_PKM_URL"] = base_url
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Commands", "pkm.py")
+    spec = importlib.util.spec_from_file_location("flame_bench_pkm", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)  # type: ignore[attr-defined]
+    return module
+
+
+def run(sizes: List[int], budget: float) -> List[Result]:
+    pack_sizes = sorted({size for size in sizes if size <= 1000})
+    results: List[Result] = []
+    previous_home = os.environ.get("FLAME_V2_HOME")
+    previous_url = os.environ.get("FLAME_V2_PKM_URL")
+    with tempfile.TemporaryDirectory(prefix="flame-bench-pkm-") as root:
+        serve_root = os.path.join(root, "serve")
+        _publish(serve_root, pack_sizes)
+        server = ThreadingHTTPServer(("127.0.0.1", 0), partial(_QuietHandler, directory=serve_root))
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            pkm = _load_pkm(os.path.join(root, "home"), f"http://127.0.0.1:{server.server_port}")
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                results.append(measure(SUITE, "download.small", 1, lambda: pkm._download(REPO, "ping.py", BRANCH), budget))
+                large = measure(SUITE, "download.8MiB", 1, lambda: pkm._download(REPO, "large.bin", BRANCH), budget)
+                results.append(large)
+                results.append(measure(SUITE, "install.py", 1, lambda: pkm._install_py(REPO, "ping.py", BRANCH), budget))
+                for size in pack_sizes:
+                    results.append(
+                        measure(SUITE, "install.zip", size, lambda: pkm._install_zip(REPO, f"pack{size}.zip", BRANCH), budget)
+                    )
+            print(f"pkm download throughput: {LARGE_PAYLOAD / large.p50 / 1024 / 1024:.1f} MiB/s (p50)")
+        finally:
+            server.shutdown()
+            server.server_close()
+            for key, value in (("FLAME_V2_HOME", previous_home), ("FLAME_V2_PKM_URL", previous_url)):
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+    return results
@@ -0,0 +1,98 @@
+"""Timing, reporting and run-to-run comparison shared by the benchmarks."""
+import json
+import os
+import time
+from typing import Callable, Dict, List, Optional
+
+MIN_ITERATIONS = 5
+TIME_BUDGET = 0.5
+
+
+class Result:
+    def __init__(self, suite: str, name: str, size: int, samples: List[float]) -> None:
+        ordered = sorted(samples)
+        self.suite = suite
+        self.name = name
+        self.size = size
+        self.iterations = len(samples)
+        self.p50 = ordered[len(ordered) // 2]
+        self.p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+        self.ops_per_sec = len(samples) / sum(samples) if sum(samples) else float("inf")
+
+    @property
+    def key(self) -> str:
+        return f"{self.suite}/{self.name}[{self.size}]"
+
+    def as_dict(self) -> Dict:
+        return {
+            "suite": self.suite,
+            "name": self.name,
+            "size": self.size,
+            "iterations": self.iterations,
+            "p50_us": self.p50 * 1e6,
+            "p95_us": self.p95 * 1e6,
+            "ops_per_sec": self.ops_per_sec,
+        }
+
+
+def measure(
+    suite: str,
+    name: str,
+    size: int,
+    func: Callable[[], object],
+    budget: float = TIME_BUDGET,
+    setup: Optional[Callable[[], object]] = None,
+) -> Result:
+    """Call `func` until `budget` seconds elapse (at least MIN_ITERATIONS times)."""
+    samples: List[float] = []
+    deadline = time.perf_counter() + budget
+    while len(samples) < MIN_ITERATIONS or time.perf_counter() < deadline:
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return Result(suite, name, size, samples)
+
+
+def _format_us(value: float) -> str:
+    if value >= 1e6:
+        return f"{value / 1e6:.2f}s"
+    if value >= 1e3:
+        return f"{value / 1e3:.2f}ms"
+    return f"{value:.1f}us"
+
+
+def print_results(results: List[Result], baseline: Optional[Dict[str, Dict]] = None) -> None:
+    header = f"{'benchmark':<44}{'iters':>7}{'p50':>11}{'p95':>11}{'ops/s':>12}"
+    if baseline is not None:
+        header += f"{'vs base':>10}"
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        row = result.as_dict()
+        line = (
+            f"{result.key:<44}{result.iterations:>7}"
+            f"{_format_us(row['p50_us']):>11}{_format_us(row['p95_us']):>11}"
+            f"{result.ops_per_sec:>12.1f}"
+        )
+        if baseline is not None:
+            previous = baseline.get(result.key)
+            if previous and previous["p50_us"]:
+                change = (row["p50_us"] - previous["p50_us"]) / previous["p50_us"] * 100
+                line += f"{change:>+9.1f}%"
+            else:
+                line += f"{'new':>10}"
+        print(line)
+
+
+def save_results(results: List[Result], path: str) -> None:
+    payload = {result.key: result.as_dict() for result in results}
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(payload, handle, indent=2)
+
+
+def load_results(path: str) -> Dict[str, Dict]:
+    with open(path, "r", encoding="utf-8") as handle:
+        return json.load(handle)
@@ -0,0 +1,45 @@
+"""Run the Flame v2 benchmark suites.
+
+    python Benchmarks/run.py [--sizes 10,100,1000,10000] [--suite core|pkm]
+                             [--budget <seconds>] [--json out.json]
+                             [--compare baseline.json]
+
+Each benchmark is repeated for `--budget` seconds and reported as p50/p95
+latency and throughput. `--json` saves the numbers and `--compare` prints the
+p50 change against a previously saved run.
+"""
+import argparse
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from Benchmarks import bench_core, bench_pkm, harness  # noqa: E402
+
+SUITES = {"core": bench_core, "pkm": bench_pkm}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Flame v2 benchmarks")
+    parser.add_argument("--sizes", default="10,100,1000,10000", help="comma separated command counts")
+    parser.add_argument("--suite", action="append", choices=sorted(SUITES), help="suite to run (repeatable)")
+    parser.add_argument("--budget", type=float, default=harness.TIME_BUDGET, help="seconds per benchmark")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="baseline results file to compare against")
+    options = parser.parse_args()
+
+    sizes = [int(size) for size in options.sizes.split(",") if size]
+    results = []
+    for name in options.suite or sorted(SUITES):
+        results.extend(SUITES[name].run(sizes, options.budget))
+    baseline = harness.load_results(options.compare) if options.compare else None
+    harness.print_results(results, baseline)
+    if options.json:
+        harness.save_results(results, options.json)
+        print(f"Saved results to {os.path.abspath(options.json)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,20 @@
 import os
 
+CHUNK_SIZE = 1024 * 1024
 
-def run(args):
+
+def run(args, ctx):
     if not args:
-        print("Usage: cat <file> [file...]")
+        ctx.write_line("Usage: cat <file> [file...]")
         return
     for path in args:
         file_path = os.path.abspath(path)
         if not os.path.isfile(file_path):
-            print(f"cat: {path}: No such file")
+            ctx.error(f"cat: {path}: No such file")
             continue
         try:
             with open(file_path, "r", encoding="utf-8") as handle:
-                print(handle.read(), end="")
+                for chunk in iter(lambda: handle.read(CHUNK_SIZE), ""):
+                    ctx.write(chunk)
         except Exception as exc:
-            print(f"cat: {exc}")
+            ctx.error(f"cat: {exc}")
@@ -1,3 +1,3 @@
 
-def run(args):
-    print(" ".join(args))
+def run(args, ctx):
+    ctx.write_line(" ".join(args))
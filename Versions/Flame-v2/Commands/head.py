@@ -0,0 +1,64 @@
+import os
+import sys
+
+USAGE = "Usage: head [-n <lines>] <file> [file...]"
+DEFAULT_LINES = 10
+
+
+def _write(data: bytes) -> None:
+    binary = getattr(sys.stdout, "buffer", None)
+    if binary is not None:
+        binary.write(data)
+    else:
+        sys.stdout.write(data.decode("utf-8", errors="replace"))
+
+
+def _parse_args(args):
+    count = DEFAULT_LINES
+    files = []
+    idx = 0
+    while idx < len(args):
+        arg = args[idx]
+        if arg == "-n" and idx + 1 < len(args):
+            count = int(args[idx + 1])
+            idx += 2
+            continue
+        if arg.startswith("-n") and len(arg) > 2:
+            count = int(arg[2:])
+        elif arg.startswith("-") and arg[1:].isdigit():
+            count = int(arg[1:])
+        else:
+            files.append(arg)
+        idx += 1
+    return max(0, count), files
+
+
+def run(args):
+    try:
+        count, files = _parse_args(args)
+    except ValueError:
+        print(USAGE)
+        return
+    if not files:
+        print(USAGE)
+        return
+    sys.stdout.flush()
+    for position, path in enumerate(files):
+        file_path = os.path.abspath(path)
+        if not os.path.isfile(file_path):
+            print(f"head: {path}: No such file")
+            continue
+        if len(files) > 1:
+            _write(f"{'' if position == 0 else chr(10)}==> {path} <==\n".encode("utf-8"))
+        try:
+            # Only the requested lines are ever read from disk.
+            with open(file_path, "rb") as handle:
+                for _ in range(count):
+                    line = handle.readline()
+                    if not line:
+                        break
+                    _write(line)
+        except OSError as exc:
+            print(f"head: {exc}")
+    binary = getattr(sys.stdout, "buffer", None)
+    (binary or sys.stdout).flush()
@@ -0,0 +1,380 @@
+import mmap
+import os
+import re
+import shutil
+import sys
+import threading
+from array import array
+from bisect import bisect_right
+from typing import List, Optional
+
+USAGE = "Usage: less [+<line> | +/<pattern>] <file>"
+INDEX_CHUNK = 4 * 1024 * 1024
+SEARCH_CHUNK = 1024 * 1024
+SEARCH_OVERLAP = 256
+MAX_LINE_BYTES = 64 * 1024
+HIGHLIGHT = "\033[7m"
+RESET = "\033[0m"
+NEWLINE = re.compile(b"\n")
+
+
+class LineIndex:
+    """Line start offsets, built in the background so the pager opens instantly."""
+
+    def __init__(self, buffer, size: int) -> None:
+        self.buffer = buffer
+        self.size = size
+        self.offsets = array("Q", [0])
+        self.scanned = 0
+        self.complete = size == 0
+        self._progress = threading.Condition()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+        if not self.complete:
+            self._thread = threading.Thread(target=self._build, name="less-index", daemon=True)
+            self._thread.start()
+
+    def _build(self) -> None:
+        position = 0
+        while position < self.size and not self._stopped:
+            end = min(self.size, position + INDEX_CHUNK)
+            self.offsets.extend(match.end() + position for match in NEWLINE.finditer(self.buffer[position:end]))
+            position = end
+            with self._progress:
+                self.scanned = position
+                self._progress.notify_all()
+        if not self._stopped and self.offsets[-1] == self.size and len(self.offsets) > 1:
+            self.offsets.pop()
+        with self._progress:
+            self.complete = True
+            self._progress.notify_all()
+
+    def stop(self) -> None:
+        self._stopped = True
+        if self._thread is not None:
+            self._thread.join()
+
+    def line_count(self) -> Optional[int]:
+        return len(self.offsets) if self.complete else None
+
+    def line_start(self, number: int) -> int:
+        """Byte offset of 0-based line `number`, waiting for the index if needed."""
+        with self._progress:
+            while number >= len(self.offsets) and not self.complete:
+                self._progress.wait()
+        return self.offsets[min(number, len(self.offsets) - 1)]
+
+    def line_number(self, offset: int) -> Optional[int]:
+        if offset > self.scanned and not self.complete:
+            return None
+        return bisect_right(self.offsets, offset) - 1
+
+
+class Pager:
+    def __init__(self, path: str, buffer, size: int) -> None:
+        self.path = path
+        self.buffer = buffer
+        self.size = size
+        self.index = LineIndex(buffer, size)
+        self.top = 0
+        self.pattern: Optional[re.Pattern] = None
+        self.text_pattern: Optional[re.Pattern] = None
+        self.message = ""
+
+    # -- navigation over byte offsets ---------------------------------------
+
+    def next_line(self, offset: int) -> int:
+        end = self.buffer.find(b"\n", offset, self.size)
+        return self.size if end < 0 else end + 1
+
+    def previous_line(self, offset: int) -> int:
+        if offset <= 0:
+            return 0
+        start = self.buffer.rfind(b"\n", 0, offset - 1)
+        return start + 1
+
+    def move(self, lines: int) -> None:
+        for _ in range(abs(lines)):
+            if lines > 0:
+                following = self.next_line(self.top)
+                if following >= self.size:
+                    break
+                self.top = following
+            else:
+                if self.top == 0:
+                    break
+                self.top = self.previous_line(self.top)
+
+    def goto_line(self, number: int) -> None:
+        self.top = self.index.line_start(max(0, number - 1))
+
+    def goto_end(self, rows: int) -> None:
+        # Walk back from EOF; no need to wait for the index.
+        offset = self.size
+        if offset and self.buffer[offset - 1:offset] == b"\n":
+            offset -= 1
+        for _ in range(rows):
+            if offset <= 0:
+                break
+            offset = self.previous_line(offset)
+        self.top = offset
+
+    # -- search ---------------------------------------------------------------
+
+    def set_pattern(self, text: str) -> None:
+        flags = re.IGNORECASE if text == text.lower() else 0
+        self.pattern = re.compile(text.encode("utf-8"), flags)
+        self.text_pattern = re.compile(text, flags)
+
+    def search(self, forward: bool) -> bool:
+        if self.pattern is None:
+            return False
+        if forward:
+            match = self.pattern.search(self.buffer, self.next_line(self.top))
+            if match is None:
+                return False
+            self.top = self.previous_line(match.start() + 1)
+            return True
+        end = self.top
+        while end > 0:
+            start = max(0, end - SEARCH_CHUNK)
+            last = None
+            for last in self.pattern.finditer(self.buffer, start, end):
+                pass
+            if last is not None:
+                self.top = self.previous_line(last.start() + 1)
+                return True
+            if start == 0:
+                break
+            # Overlap chunks slightly so matches across a boundary are found.
+            end = start + SEARCH_OVERLAP
+        return False
+
+    # -- rendering ------------------------------------------------------------
+
+    def visible_lines(self, rows: int) -> List[str]:
+        lines = []
+        offset = self.top
+        while len(lines) < rows and offset < self.size:
+            end = self.buffer.find(b"\n", offset, min(self.size, offset + MAX_LINE_BYTES))
+            stop = end if end >= 0 else min(self.size, offset + MAX_LINE_BYTES)
+            lines.append(self.buffer[offset:stop].decode("utf-8", errors="replace").rstrip("\r"))
+            offset = self.next_line(offset) if end < 0 else end + 1
+        return lines
+
+    def _decorate(self, line: str, width: int) -> str:
+        line = line.expandtabs(8)[:width]
+        if self.text_pattern is None:
+            return line
+        return self.text_pattern.sub(lambda match: f"{HIGHLIGHT}{match.group(0)}{RESET}", line)
+
+    def status(self, rows: int) -> str:
+        if self.message:
+            return self.message
+        first = self.index.line_number(self.top)
+        total = self.index.line_count()
+        first_text = "?" if first is None else str(first + 1)
+        total_text = "indexing..." if total is None else str(total)
+        percent = int(self.top * 100 / self.size) if self.size else 100
+        return f"{os.path.basename(self.path)}  line {first_text}/{total_text}  {percent}%  (q quit, / search, h help)"
+
+    def render(self, rows: int, width: int) -> str:
+        body = [self._decorate(line, width) for line in self.visible_lines(rows - 1)]
+        body += ["~"] * (rows - 1 - len(body))
+        frame = "\033[H\033[2J" + "\r\n".join(body)
+        return frame + f"\r\n{HIGHLIGHT}{self.status(rows)[:width - 1]}{RESET}"
+
+
+HELP_TEXT = (
+    "j/k/arrows line  space/b page  d/u half page  g/G top/end  <n>g line n  "
+    ":<n> line n  /re ?re search  n/N repeat  q quit"
+)
+
+
+class _Keys:
+    """Split raw terminal input into keys, keeping anything read ahead."""
+
+    SEQUENCES = {
+        b"\x1b[A": "k", b"\x1b[B": "j", b"\x1b[5~": "b", b"\x1b[6~": " ",
+        b"\x1b[H": "g", b"\x1b[F": "G",
+    }
+
+    def __init__(self, fd: int) -> None:
+        self.fd = fd
+        self.pending = b""
+
+    def read(self, raw: bool = False) -> str:
+        if not self.pending:
+            self.pending = os.read(self.fd, 64)
+        if not raw:
+            for sequence, key in self.SEQUENCES.items():
+                if self.pending.startswith(sequence):
+                    self.pending = self.pending[len(sequence):]
+                    return key
+        lead = self.pending[0]
+        length = 1 if lead < 0xC0 else 2 if lead < 0xE0 else 3 if lead < 0xF0 else 4
+        while len(self.pending) < length:
+            self.pending += os.read(self.fd, 64)
+        char = self.pending[:length].decode("utf-8", errors="ignore")
+        self.pending = self.pending[length:]
+        if not raw and char in ("\r", "\n"):
+            return "j"
+        return char
+
+
+def _prompt(keys: _Keys, label: str, rows: int) -> str:
+    text = ""
+    while True:
+        sys.stdout.write(f"\033[{rows};1H\033[2K{label}{text}")
+        sys.stdout.flush()
+        char = keys.read(raw=True)
+        if char in ("\r", "\n"):
+            return text
+        if char == "\x1b":
+            keys.pending = b""
+            return ""
+        if char in ("\x7f", "\b"):
+            text = text[:-1]
+        elif char.isprintable():
+            text += char
+
+
+def _interactive(pager: Pager, start: Optional[str]) -> None:
+    import termios
+    import tty
+
+    fd = sys.stdin.fileno()
+    saved = termios.tcgetattr(fd)
+    size = shutil.get_terminal_size((80, 24))
+    if start:
+        _apply_start(pager, start, size.lines - 1)
+    keys = _Keys(fd)
+    count = ""
+    try:
+        tty.setcbreak(fd)
+        sys.stdout.write("\033[?1049h\033[?25l")
+        while True:
+            size = shutil.get_terminal_size((80, 24))
+            rows, width = size.lines, size.columns
+            page = rows - 1
+            sys.stdout.write(pager.render(rows, width))
+            sys.stdout.flush()
+            pager.message = ""
+            key = keys.read()
+            if key.isdigit():
+                count += key
+                pager.message = f":{count}"
+                continue
+            repeat = int(count) if count else None
+            count = ""
+            if key == "q":
+                break
+            elif key == "j":
+                pager.move(repeat or 1)
+            elif key == "k":
+                pager.move(-(repeat or 1))
+            elif key in (" ", "f"):
+                pager.move(page)
+            elif key == "b":
+                pager.move(-page)
+            elif key == "d":
+                pager.move(page // 2)
+            elif key == "u":
+                pager.move(-(page // 2))
+            elif key == "g":
+                pager.goto_line(repeat or 1)
+            elif key == "G":
+                if repeat:
+                    pager.goto_line(repeat)
+                else:
+                    pager.goto_end(page)
+            elif key == ":":
+                answer = _prompt(keys, ":", rows)
+                if answer.isdigit():
+                    pager.goto_line(int(answer))
+            elif key in ("/", "?"):
+                answer = _prompt(keys, key, rows)
+                if answer:
+                    try:
+                        pager.set_pattern(answer)
+                    except re.error as exc:
+                        pager.message = f"bad pattern: {exc}"
+                        continue
+                if not pager.search(forward=key == "/"):
+                    pager.message = "Pattern not found"
+            elif key in ("n", "N"):
+                if not pager.search(forward=key == "n"):
+                    pager.message = "Pattern not found"
+            elif key == "h":
+                pager.message = HELP_TEXT
+    finally:
+        sys.stdout.write("\033[?25h\033[?1049l")
+        sys.stdout.flush()
+        termios.tcsetattr(fd, termios.TCSADRAIN, saved)
+
+
+def _apply_start(pager: Pager, start: str, page: int) -> None:
+    if start.startswith("/"):
+        pager.top = 0
+        try:
+            pager.set_pattern(start[1:])
+        except re.error as exc:
+            pager.message = f"bad pattern: {exc}"
+            return
+        if pager.pattern.match(pager.buffer, 0) is None and not pager.search(forward=True):
+            pager.message = "Pattern not found"
+    elif start == "G":
+        pager.goto_end(page)
+    elif start.isdigit():
+        pager.goto_line(int(start))
+
+
+def _dump(pager: Pager, start: Optional[str]) -> None:
+    # Not a terminal: print from the start position like `cat`.
+    if start:
+        _apply_start(pager, start, shutil.get_terminal_size((80, 24)).lines - 1)
+        if pager.message:
+            print(f"less: {pager.message}", file=sys.stderr)
+    sys.stdout.flush()
+    binary = getattr(sys.stdout, "buffer", None)
+    for position in range(pager.top, pager.size, INDEX_CHUNK):
+        chunk = pager.buffer[position:min(pager.size, position + INDEX_CHUNK)]
+        if binary is not None:
+            binary.write(chunk)
+        else:
+            sys.stdout.write(chunk.decode("utf-8", errors="replace"))
+    if binary is not None:
+        binary.flush()
+
+
+def run(args):
+    start = None
+    files = []
+    for arg in args:
+        if arg.startswith("+") and len(arg) > 1:
+            start = arg[1:]
+        else:
+            files.append(arg)
+    if len(files) != 1:
+        print(USAGE)
+        return
+    path = os.path.abspath(files[0])
+    if not os.path.isfile(path):
+        print(f"less: {files[0]}: No such file")
+        return
+    with open(path, "rb") as handle:
+        size = os.fstat(handle.fileno()).st_size
+        buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        pager = Pager(path, buffer, size)
+        try:
+            if sys.stdin.isatty() and sys.stdout.isatty():
+                try:
+                    _interactive(pager, start)
+                except ImportError:
+                    _dump(pager, start)
+            else:
+                _dump(pager, start)
+        finally:
+            pager.index.stop()
+            if size:
+                buffer.close()
@@ -1,20 +1,19 @@
 import os
 
 
-def run(args):
+def run(args, ctx):
     target = args[0] if args else os.getcwd()
     target_path = os.path.abspath(target)
     if not os.path.exists(target_path):
-        print(f"ls: cannot access '{target}': No such file or directory")
+        ctx.error(f"ls: cannot access '{target}': No such file or directory")
         return
     if os.path.isfile(target_path):
-        print(os.path.basename(target_path))
+        ctx.write_line(os.path.basename(target_path))
         return
     try:
-        entries = sorted(os.listdir(target_path))
-        for entry in entries:
-            print(entry)
+        with os.scandir(target_path) as entries:
+            ctx.write_lines(sorted(entry.name for entry in entries))
     except PermissionError:
-        print(f"ls: cannot open directory '{target}': Permission denied")
+        ctx.error(f"ls: cannot open directory '{target}': Permission denied")
     except Exception as exc:
-        print(f"ls: {exc}")
+        ctx.error(f"ls: {exc}")
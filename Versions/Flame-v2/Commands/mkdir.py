@@ -1,16 +1,16 @@
 import os
 
 
-def run(args):
+def run(args, ctx):
     if not args:
-        print("Usage: mkdir <directory> [directory...]")
+        ctx.write_line("Usage: mkdir <directory> [directory...]")
         return
     for path in args:
         expanded = os.path.abspath(path)
         try:
             os.makedirs(expanded, exist_ok=False)
-            print(f"Created directory: {expanded}")
+            ctx.write_line(f"Created directory: {expanded}")
         except FileExistsError:
-            print(f"mkdir: cannot create directory '{path}': File exists")
+            ctx.error(f"mkdir: cannot create directory '{path}': File exists")
         except Exception as exc:
-            print(f"mkdir: {exc}")
+            ctx.error(f"mkdir: {exc}")
@@ -1,10 +1,212 @@
+import asyncio
+import platform
+import re
+import shutil
 import time
+from typing import Dict, List, Optional, Tuple
 
+USAGE = (
+    "Usage: ping [-c count] [-i interval] [-W timeout] [-j jobs] [--tcp [port]] "
+    "[-f hostfile] host[:port] [host...]"
+)
+DEFAULT_COUNT = 4
+DEFAULT_INTERVAL = 1.0
+DEFAULT_TIMEOUT = 2.0
+DEFAULT_JOBS = 64
+DEFAULT_TCP_PORT = 80
+TIME_PATTERN = re.compile(r"time[=<]\s*([\d.]+)\s*ms")
+WINDOWS = platform.system().lower().startswith("win")
 
-def run(args):
-    target = args[0] if args else "flame"
-    delay = 0.05
-    for _ in range(3):
-        print(f"Pinging {target}...")
-        time.sleep(delay)
-    print(f"Reply from {target}: flame is alive")
+
+class PingOptions:
+    def __init__(self) -> None:
+        self.count = DEFAULT_COUNT
+        self.interval = DEFAULT_INTERVAL
+        self.timeout = DEFAULT_TIMEOUT
+        self.jobs = DEFAULT_JOBS
+        self.tcp_port: Optional[int] = None
+        self.hosts: List[str] = []
+
+
+def _read_hosts(path: str) -> List[str]:
+    hosts = []
+    with open(path, "r", encoding="utf-8") as handle:
+        for line in handle:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                hosts.extend(line.split())
+    return hosts
+
+
+def _parse_args(args: List[str]) -> PingOptions:
+    options = PingOptions()
+    idx = 0
+    while idx < len(args):
+        arg = args[idx]
+        value = args[idx + 1] if idx + 1 < len(args) else None
+        if arg == "-c" and value:
+            options.count = max(1, int(value))
+            idx += 2
+        elif arg == "-i" and value:
+            options.interval = max(0.0, float(value))
+            idx += 2
+        elif arg == "-W" and value:
+            options.timeout = max(0.1, float(value))
+            idx += 2
+        elif arg == "-j" and value:
+            options.jobs = max(1, int(value))
+            idx += 2
+        elif arg == "-f" and value:
+            options.hosts.extend(_read_hosts(value))
+            idx += 2
+        elif arg == "--tcp":
+            if value and value.isdigit():
+                options.tcp_port = int(value)
+                idx += 2
+            else:
+                options.tcp_port = DEFAULT_TCP_PORT
+                idx += 1
+        elif arg.startswith("-"):
+            raise ValueError(f"unknown option {arg}")
+        else:
+            options.hosts.append(arg)
+            idx += 1
+    return options
+
+
+def _split_host(host: str, default_port: int) -> Tuple[str, int]:
+    if host.count(":") == 1:
+        name, port = host.split(":")
+        if port.isdigit():
+            return name, int(port)
+    return host, default_port
+
+
+async def _tcp_probe(host: str, options: PingOptions) -> List[Optional[float]]:
+    name, port = _split_host(host, options.tcp_port or DEFAULT_TCP_PORT)
+    results: List[Optional[float]] = []
+    for seq in range(1, options.count + 1):
+        started = time.perf_counter()
+        try:
+            _reader, writer = await asyncio.wait_for(asyncio.open_connection(name, port), options.timeout)
+        except (OSError, asyncio.TimeoutError) as exc:
+            if isinstance(exc, asyncio.TimeoutError):
+                reason = "timeout"
+            elif isinstance(exc, ConnectionRefusedError):
+                reason = "connection refused"
+            else:
+                reason = exc.strerror or str(exc)
+            print(f"{host}: seq={seq} {reason}")
+            results.append(None)
+        else:
+            rtt = (time.perf_counter() - started) * 1000
+            writer.close()
+            print(f"{host}: seq={seq} tcp/{port} time={rtt:.2f} ms")
+            results.append(rtt)
+        if seq < options.count:
+            await asyncio.sleep(options.interval)
+    return results
+
+
+def _icmp_command(host: str, options: PingOptions) -> List[str]:
+    if WINDOWS:
+        return ["ping", "-n", str(options.count), "-w", str(int(options.timeout * 1000)), host]
+    return [
+        "ping", "-c", str(options.count), "-i", str(max(options.interval, 0.2)),
+        "-W", str(max(1, int(round(options.timeout)))), host,
+    ]
+
+
+async def _icmp_probe(host: str, options: PingOptions) -> List[Optional[float]]:
+    process = await asyncio.create_subprocess_exec(
+        *_icmp_command(host, options),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+    )
+    times: List[float] = []
+    deadline = options.count * (options.interval + options.timeout) + 1
+    try:
+        async def _read() -> None:
+            while True:
+                line = await process.stdout.readline()
+                if not line:
+                    break
+                match = TIME_PATTERN.search(line.decode(errors="replace"))
+                if match:
+                    times.append(float(match.group(1)))
+                    print(f"{host}: seq={len(times)} time={times[-1]:.2f} ms")
+
+        await asyncio.wait_for(_read(), deadline)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        if process.returncode is None:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+        await process.wait()
+    lost = max(0, options.count - len(times))
+    if lost:
+        print(f"{host}: {lost} of {options.count} probes lost")
+    return times + [None] * lost
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def _summary_row(host: str, results: List[Optional[float]]) -> str:
+    received = [value for value in results if value is not None]
+    loss = (len(results) - len(received)) / len(results) * 100 if results else 100.0
+    if received:
+        stats = (
+            f"{min(received):>9.2f}{sum(received) / len(received):>9.2f}"
+            f"{max(received):>9.2f}{_percentile(received, 0.95):>9.2f}"
+        )
+    else:
+        stats = f"{'-':>9}{'-':>9}{'-':>9}{'-':>9}"
+    return f"{host:<28}{len(results):>5}{len(received):>6}{loss:>7.1f}%{stats}"
+
+
+async def _ping_all(options: PingOptions) -> Dict[str, List[Optional[float]]]:
+    use_tcp = options.tcp_port is not None or shutil.which("ping") is None
+    probe = _tcp_probe if use_tcp else _icmp_probe
+    semaphore = asyncio.Semaphore(options.jobs)
+    results: Dict[str, List[Optional[float]]] = {}
+
+    async def _one(host: str) -> None:
+        async with semaphore:
+            try:
+                results[host] = await probe(host, options)
+            except OSError as exc:
+                print(f"{host}: {exc}")
+                results[host] = [None] * options.count
+
+    mode = f"tcp port {options.tcp_port or DEFAULT_TCP_PORT}" if use_tcp else "icmp"
+    print(f"Pinging {len(options.hosts)} host(s) via {mode}, {options.count} probe(s) each...")
+    await asyncio.gather(*(_one(host) for host in options.hosts))
+    return results
+
+
+async def run(args):
+    try:
+        options = _parse_args(args)
+    except (ValueError, OSError) as exc:
+        print(f"ping: {exc}")
+        print(USAGE)
+        return
+    if not options.hosts:
+        print(USAGE)
+        return
+    started = time.perf_counter()
+    results = await _ping_all(options)
+    print()
+    print(f"{'host':<28}{'sent':>5}{'recv':>6}{'loss':>8}{'min':>9}{'avg':>9}{'max':>9}{'p95':>9}")
+    for host in options.hosts:
+        print(_summary_row(host, results.get(host, [])))
+    all_results = [value for host in options.hosts for value in results.get(host, [])]
+    if len(options.hosts) > 1:
+        print(_summary_row("(all hosts)", all_results))
+    print(f"\n{len(options.hosts)} host(s) checked in {time.perf_counter() - started:.2f}s")
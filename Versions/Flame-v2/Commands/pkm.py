@@ -1,3 +1,4 @@
+import hashlib
 import importlib.util
 import json
 import os
@@ -5,16 +6,28 @@ import shutil
 import subprocess
 import sys
 import tempfile
+import time
 import zipfile
 from io import BytesIO
-from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
 from urllib.error import HTTPError, URLError
-from urllib.request import urlopen
+from urllib.request import Request, urlopen
 
 HOME = os.environ.get("FLAME_V2_HOME", os.path.dirname(os.path.abspath(__file__)))
 INSTALLED_DIR = os.path.join(HOME, "Installed")
 REGISTRY_FILE = os.path.join(INSTALLED_DIR, "pkm_registry.json")
+LOCK_FILE = os.path.join(INSTALLED_DIR, "pkm.lock.json")
+INDEX_CACHE_FILE = os.path.join(INSTALLED_DIR, "pkm_index.json")
+LOCK_VERSION = 1
+INDEX_VERSION = 1
+INDEX_NAME = "index.json"
+INDEX_TTL = float(os.environ.get("FLAME_V2_PKM_INDEX_TTL", "3600"))
+HASH_WORKERS = min(8, os.cpu_count() or 1)
 DEFAULT_BRANCH = "main"
+DEFAULT_REPO = os.environ.get("FLAME_V2_PKM_REPO", "randompixle/Flame")
+RAW_BASE_URL = os.environ.get("FLAME_V2_PKM_URL", "https://raw.githubusercontent.com").rstrip("/")
+API_BASE_URL = os.environ.get("FLAME_V2_PKM_API_URL", "https://api.github.com").rstrip("/")
 
 
 def _load_registry() -> Dict[str, Dict]:
@@ -33,6 +46,101 @@ def _save_registry(data: Dict[str, Dict]) -> None:
         json.dump(data, handle, indent=2)
 
 
+def _load_lock() -> Dict[str, Dict]:
+    if not os.path.isfile(LOCK_FILE):
+        return {}
+    with open(LOCK_FILE, "r", encoding="utf-8") as handle:
+        try:
+            return json.load(handle).get("packages", {})
+        except (json.JSONDecodeError, AttributeError):
+            return {}
+
+
+def _save_lock(packages: Dict[str, Dict]) -> None:
+    os.makedirs(os.path.dirname(LOCK_FILE), exist_ok=True)
+    tmp_path = f"{LOCK_FILE}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump({"version": LOCK_VERSION, "packages": packages}, handle, indent=2, sort_keys=True)
+    os.replace(tmp_path, LOCK_FILE)
+
+
+def _sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _sha256_and_mtime(path: str) -> Optional[Tuple[str, int]]:
+    """(sha256, mtime_ns) of the file as it was hashed, or None if it is gone."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as handle:
+            for block in iter(lambda: handle.read(1024 * 1024), b""):
+                digest.update(block)
+            mtime_ns = os.fstat(handle.fileno()).st_mtime_ns
+    except OSError:
+        return None
+    return digest.hexdigest(), mtime_ns
+
+
+def _lock_entry(name: str, record: Dict) -> Dict:
+    path = os.path.join(INSTALLED_DIR, f"{name}.py")
+    stat = os.stat(path)
+    entry = {key: record[key] for key in ("repo", "item", "branch", "type") if key in record}
+    entry.update(
+        {
+            "file": f"{name}.py",
+            "sha256": _sha256_file(path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+    )
+    return entry
+
+
+def _update_lock(names: List[str], registry: Dict[str, Dict]) -> None:
+    lock = _load_lock()
+    for name in names:
+        if name in registry:
+            lock[name] = _lock_entry(name, registry[name])
+    _save_lock(lock)
+
+
+def _verify_lock(lock: Dict[str, Dict]) -> Dict[str, str]:
+    """Return name -> "ok" | "modified" | "missing", hashing only stat changes."""
+    results: Dict[str, str] = {}
+    to_hash: List[str] = []
+    for name, entry in lock.items():
+        path = os.path.join(INSTALLED_DIR, entry["file"])
+        try:
+            stat = os.stat(path)
+        except OSError:
+            results[name] = "missing"
+            continue
+        if stat.st_size == entry["size"] and stat.st_mtime_ns == entry["mtime_ns"]:
+            results[name] = "ok"
+        elif stat.st_size != entry["size"]:
+            results[name] = "modified"
+        else:
+            to_hash.append(name)
+    paths = [os.path.join(INSTALLED_DIR, lock[name]["file"]) for name in to_hash]
+    with ThreadPoolExecutor(max_workers=HASH_WORKERS) as executor:
+        for name, hashed in zip(to_hash, executor.map(_sha256_and_mtime, paths)):
+            if hashed is None:
+                # Removed between the stat and the hash.
+                results[name] = "missing"
+            elif hashed[0] == lock[name]["sha256"]:
+                # Touched but unchanged: remember the new mtime so the next
+                # verify takes the stat fast path again.
+                lock[name]["mtime_ns"] = hashed[1]
+                results[name] = "ok"
+            else:
+                results[name] = "modified"
+    return results
+
+
 def _terminal_width() -> int:
     try:
         import shutil as pyshutil
@@ -56,7 +164,7 @@ def _clear_progress_line() -> None:
 
 
 def _download(repo: str, item: str, branch: str) -> bytes:
-    url = f"https://raw.githubusercontent.com/{repo}/{branch}/FlameCommands/{item}"
+    url = f"{RAW_BASE_URL}/{repo}/{branch}/FlameCommands/{item}"
     try:
         with urlopen(url) as response:
             total = response.length or 0
@@ -80,6 +188,172 @@ def _download(repo: str, item: str, branch: str) -> bytes:
         raise RuntimeError(f"Network error: {exc.reason}") from exc
 
 
+def _fetch(url: str, etag: Optional[str] = None) -> Tuple[Optional[bytes], Optional[str]]:
+    """GET `url`, conditionally on `etag`; return (None, etag) when it is unchanged."""
+    headers = {"User-Agent": "flame-pkm"}
+    if etag:
+        headers["If-None-Match"] = etag
+    try:
+        with urlopen(Request(url, headers=headers)) as response:
+            return response.read(), response.headers.get("ETag")
+    except HTTPError as exc:
+        if exc.code == 304:
+            return None, etag
+        raise
+
+
+def _index_from_listing(listing: List[Dict]) -> Dict[str, Dict]:
+    packages: Dict[str, Dict] = {}
+    for entry in listing:
+        file_name = entry.get("name", "")
+        stem, ext = os.path.splitext(file_name)
+        if entry.get("type") != "file" or ext not in (".py", ".zip") or stem.startswith("_"):
+            continue
+        packages[stem] = {
+            "file": file_name,
+            "type": "zip" if ext == ".zip" else "file",
+            "description": "",
+            "size": entry.get("size"),
+            "git_sha": entry.get("sha"),
+        }
+    return packages
+
+
+def _refresh_index(repo: str, branch: str, cached: Optional[Dict]) -> Dict:
+    """Fetch the repo's FlameCommands/index.json, or build one from the directory listing."""
+    sources = [
+        ("index", f"{RAW_BASE_URL}/{repo}/{branch}/FlameCommands/{INDEX_NAME}"),
+        ("listing", f"{API_BASE_URL}/repos/{repo}/contents/FlameCommands?ref={branch}"),
+    ]
+    for source, url in sources:
+        etag = cached.get("etag") if cached and cached.get("source") == source else None
+        try:
+            body, etag = _fetch(url, etag)
+        except HTTPError as exc:
+            if exc.code == 404 and source == "index":
+                continue
+            raise RuntimeError(f"HTTP error: {exc.code} {exc.reason}") from exc
+        except URLError as exc:
+            raise RuntimeError(f"Network error: {exc.reason}") from exc
+        if body is None:
+            packages = cached["packages"]
+        else:
+            try:
+                data = json.loads(body.decode("utf-8"))
+            except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+                raise RuntimeError(f"{url} is not valid JSON") from exc
+            packages = data.get("packages", {}) if source == "index" else _index_from_listing(data)
+        return {"source": source, "etag": etag, "fetched": time.time(), "packages": packages}
+    raise RuntimeError(f"{repo} has no FlameCommands directory on {branch}")
+
+
+def _load_index_cache() -> Dict[str, Dict]:
+    if not os.path.isfile(INDEX_CACHE_FILE):
+        return {}
+    with open(INDEX_CACHE_FILE, "r", encoding="utf-8") as handle:
+        try:
+            return json.load(handle).get("indexes", {})
+        except (json.JSONDecodeError, AttributeError):
+            return {}
+
+
+def _save_index_cache(indexes: Dict[str, Dict]) -> None:
+    os.makedirs(os.path.dirname(INDEX_CACHE_FILE), exist_ok=True)
+    tmp_path = f"{INDEX_CACHE_FILE}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump({"version": INDEX_VERSION, "indexes": indexes}, handle, indent=2, sort_keys=True)
+    os.replace(tmp_path, INDEX_CACHE_FILE)
+
+
+def _format_age(seconds: float) -> str:
+    for unit, size in (("d", 86400), ("h", 3600), ("m", 60)):
+        if seconds >= size:
+            return f"{int(seconds // size)}{unit}"
+    return f"{int(seconds)}s"
+
+
+def _get_index(repo: str, branch: str, refresh: bool = False) -> Dict:
+    """Return the cached index for repo@branch, refetching it once it is older than INDEX_TTL.
+
+    A stale cache is still used (with a warning) when the network is unavailable.
+    """
+    indexes = _load_index_cache()
+    key = f"{repo}@{branch}"
+    cached = indexes.get(key)
+    if cached and not refresh and time.time() - cached.get("fetched", 0) < INDEX_TTL:
+        return cached
+    try:
+        index = _refresh_index(repo, branch, cached)
+    except RuntimeError as exc:
+        if not cached:
+            raise
+        age = _format_age(time.time() - cached.get("fetched", 0))
+        print(f"pkm: {exc}; using cached index from {age} ago")
+        return cached
+    indexes[key] = index
+    _save_index_cache(indexes)
+    return index
+
+
+def _resolve_item(repo: str, item: str, branch: str) -> Tuple[str, str, Dict]:
+    """Map a package name to (file, type, index entry); explicit file names pass through."""
+    if item.endswith((".py", ".zip")):
+        return item, "zip" if item.endswith(".zip") else "file", {}
+    entry = _get_index(repo, branch)["packages"].get(item)
+    if entry is None:
+        raise RuntimeError(f"no package named {item} in {repo} ({branch}); try `pkm search`")
+    return entry["file"], entry.get("type", "file"), entry
+
+
+def _describe_source(path: str) -> str:
+    """First line of a command's docstring or leading comment, for index.json."""
+    import ast
+
+    with open(path, "r", encoding="utf-8") as handle:
+        text = handle.read()
+    try:
+        docstring = ast.get_docstring(ast.parse(text))
+    except SyntaxError:
+        docstring = None
+    if docstring:
+        return docstring.strip().splitlines()[0]
+    for line in text.splitlines():
+        if line.startswith("#") and not line.startswith(("#!", "#require:")):
+            return line.lstrip("#").strip()
+        if line.strip() and not line.startswith("#"):
+            break
+    return ""
+
+
+def _build_index(directory: str) -> Dict[str, Dict]:
+    packages: Dict[str, Dict] = {}
+    for file_name in sorted(os.listdir(directory)):
+        stem, ext = os.path.splitext(file_name)
+        path = os.path.join(directory, file_name)
+        if ext not in (".py", ".zip") or stem.startswith("_") or not os.path.isfile(path):
+            continue
+        entry = {
+            "file": file_name,
+            "type": "zip" if ext == ".zip" else "file",
+            "sha256": _sha256_file(path),
+            "size": os.path.getsize(path),
+        }
+        if ext == ".py":
+            entry["description"] = _describe_source(path)
+            with open(path, "r", encoding="utf-8") as handle:
+                entry["requires"] = _requirements_from_text(handle.read())
+        else:
+            with zipfile.ZipFile(path) as archive:
+                entry["description"] = archive.comment.decode("utf-8", "replace").strip()
+                entry["commands"] = sorted(
+                    os.path.splitext(os.path.basename(name))[0]
+                    for name in archive.namelist()
+                    if name.endswith(".py") and not os.path.basename(name).startswith("_")
+                )
+        packages[stem] = entry
+    return packages
+
+
 def _write_file(target_path: str, content: bytes) -> None:
     os.makedirs(os.path.dirname(target_path), exist_ok=True)
     with open(target_path, "wb") as handle:
@@ -114,8 +388,16 @@ def _install_requirements(reqs: List[str]) -> None:
     subprocess.run(cmd, check=False)
 
 
-def _install_py(repo: str, item: str, branch: str, name_override: str = None) -> str:
+def _check_digest(name: str, content: bytes, expected_sha256: Optional[str]) -> None:
+    if expected_sha256 and hashlib.sha256(content).hexdigest() != expected_sha256:
+        raise RuntimeError(f"{name}: downloaded content does not match the expected sha256")
+
+
+def _install_py(
+    repo: str, item: str, branch: str, name_override: str = None, expected_sha256: Optional[str] = None
+) -> str:
     content = _download(repo, item, branch)
+    _check_digest(name_override or item, content, expected_sha256)
     try:
         text = content.decode("utf-8")
     except UnicodeDecodeError as exc:
@@ -130,8 +412,16 @@ def _install_py(repo: str, item: str, branch: str, name_override: str = None) ->
     return name
 
 
-def _install_zip(repo: str, item: str, branch: str) -> List[str]:
+def _install_zip(
+    repo: str,
+    item: str,
+    branch: str,
+    only: Optional[Set[str]] = None,
+    expected: Optional[Dict[str, str]] = None,
+    archive_sha256: Optional[str] = None,
+) -> List[str]:
     content = _download(repo, item, branch)
+    _check_digest(item, content, archive_sha256)
     installed_names: List[str] = []
     with zipfile.ZipFile(BytesIO(content)) as archive:
         with tempfile.TemporaryDirectory() as temp_dir:
@@ -142,6 +432,11 @@ def _install_zip(repo: str, item: str, branch: str) -> List[str]:
                         continue
                     src_path = os.path.join(root, entry)
                     name = os.path.splitext(entry)[0]
+                    if only is not None and name not in only:
+                        continue
+                    if expected and name in expected:
+                        with open(src_path, "rb") as handle:
+                            _check_digest(name, handle.read(), expected[name])
                     dst_path = os.path.join(INSTALLED_DIR, entry)
                     shutil.copyfile(src_path, dst_path)
                     with open(src_path, "r", encoding="utf-8") as handle:
@@ -167,21 +462,30 @@ def _restart_terminal() -> None:
 
 def _print_usage() -> None:
     print("pkm usage:")
-    print("  pkm install <owner/repo> <file.py|pack.zip> [--branch <branch>] [--name <alias>]")
+    print("  pkm install [<owner/repo>] <name|file.py|pack.zip> [--branch <branch>] [--name <alias>]")
     print("  pkm update <name>")
     print("  pkm remove <name>")
     print("  pkm list")
+    print("  pkm search [<query>] [--repo <owner/repo>] [--branch <branch>]")
+    print("  pkm info <name> [--repo <owner/repo>] [--branch <branch>]")
+    print("  pkm index [--repo <owner/repo>] [--branch <branch>] [--refresh]")
+    print("  pkm index build <directory>")
+    print("  pkm verify")
+    print("  pkm lock")
+    print("  pkm sync")
     print("  pkm restart")
 
 
 def _install_command(args: List[str]) -> None:
-    if len(args) < 2:
+    if not args or args[0].startswith("--"):
         _print_usage()
         return
-    repo, item = args[0], args[1]
+    if len(args) == 1 or args[1].startswith("--"):
+        repo, item, idx = DEFAULT_REPO, args[0], 1
+    else:
+        repo, item, idx = args[0], args[1], 2
     branch = DEFAULT_BRANCH
     name_override = None
-    idx = 2
     while idx < len(args):
         if args[idx] == "--branch" and idx + 1 < len(args):
             branch = args[idx + 1]
@@ -194,8 +498,9 @@ def _install_command(args: List[str]) -> None:
             return
     registry = _load_registry()
     try:
-        if item.endswith(".zip"):
-            installed_names = _install_zip(repo, item, branch)
+        item, item_type, entry = _resolve_item(repo, item, branch)
+        if item_type == "zip":
+            installed_names = _install_zip(repo, item, branch, archive_sha256=entry.get("sha256"))
             for name in installed_names:
                 registry[name] = {
                     "repo": repo,
@@ -205,7 +510,10 @@ def _install_command(args: List[str]) -> None:
                 }
                 print(f"Installed {name} from pack {item}")
         else:
-            name = _install_py(repo, item, branch, name_override=name_override)
+            name = _install_py(
+                repo, item, branch, name_override=name_override, expected_sha256=entry.get("sha256")
+            )
+            installed_names = [name]
             registry[name] = {
                 "repo": repo,
                 "item": item,
@@ -217,6 +525,7 @@ def _install_command(args: List[str]) -> None:
         print(f"pkm install error: {exc}")
         return
     _save_registry(registry)
+    _update_lock(installed_names, registry)
 
 
 def _update_command(args: List[str]) -> None:
@@ -245,8 +554,10 @@ def _update_command(args: List[str]) -> None:
     else:
         item = record["item"]
         _install_py(repo, item, branch, name_override=name)
+        installed_names = [name]
         print(f"Updated {name}")
     _save_registry(registry)
+    _update_lock(installed_names, registry)
 
 
 def _remove_command(args: List[str]) -> None:
@@ -261,6 +572,9 @@ def _remove_command(args: List[str]) -> None:
     _remove_installed(name)
     del registry[name]
     _save_registry(registry)
+    lock = _load_lock()
+    if lock.pop(name, None) is not None:
+        _save_lock(lock)
     print(f"Removed {name}")
 
 
@@ -274,6 +588,192 @@ def _list_commands() -> None:
         print(f"{name} -> {info['repo']} ({branch}) [{info.get('type')}] {info['item']}")
 
 
+def _index_options(args: List[str]) -> Optional[Tuple[List[str], str, str, bool]]:
+    """Split `--repo`, `--branch` and `--refresh` from positional arguments."""
+    positional: List[str] = []
+    repo, branch, refresh = DEFAULT_REPO, DEFAULT_BRANCH, False
+    idx = 0
+    while idx < len(args):
+        if args[idx] == "--repo" and idx + 1 < len(args):
+            repo = args[idx + 1]
+            idx += 2
+        elif args[idx] == "--branch" and idx + 1 < len(args):
+            branch = args[idx + 1]
+            idx += 2
+        elif args[idx] == "--refresh":
+            refresh = True
+            idx += 1
+        elif args[idx].startswith("--"):
+            print(f"Unknown option: {args[idx]}")
+            return None
+        else:
+            positional.append(args[idx])
+            idx += 1
+    return positional, repo, branch, refresh
+
+
+def _search_command(args: List[str]) -> None:
+    options = _index_options(args)
+    if options is None:
+        return
+    terms, repo, branch, refresh = options
+    try:
+        packages = _get_index(repo, branch, refresh)["packages"]
+    except RuntimeError as exc:
+        print(f"pkm search error: {exc}")
+        return
+    terms = [term.lower() for term in terms]
+    matches = []
+    for name, entry in packages.items():
+        haystack = f"{name} {entry.get('description', '')} {' '.join(entry.get('commands', []))}".lower()
+        if all(term in haystack for term in terms):
+            # Names that start with the first term sort ahead of description hits.
+            matches.append((not terms or not name.lower().startswith(terms[0]), name, entry))
+    if not matches:
+        print(f"pkm: nothing in {repo} ({branch}) matches {' '.join(terms)!r}")
+        return
+    registry = _load_registry()
+    width = max(len(name) for _rank, name, _entry in matches)
+    for _rank, name, entry in sorted(matches, key=lambda match: (match[0], match[1])):
+        marker = "*" if name in registry else " "
+        print(f"{marker} {name:<{width}}  [{entry.get('type', 'file')}]  {entry.get('description', '')}".rstrip())
+
+
+def _info_command(args: List[str]) -> None:
+    options = _index_options(args)
+    if options is None:
+        return
+    names, repo, branch, refresh = options
+    if len(names) != 1:
+        _print_usage()
+        return
+    name = names[0]
+    try:
+        entry = _get_index(repo, branch, refresh)["packages"].get(name)
+    except RuntimeError as exc:
+        print(f"pkm info error: {exc}")
+        return
+    if entry is None:
+        print(f"pkm: no package named {name} in {repo} ({branch})")
+        return
+    print(f"name:        {name}")
+    print(f"source:      {repo} ({branch}) FlameCommands/{entry['file']}")
+    print(f"type:        {entry.get('type', 'file')}")
+    for key in ("description", "size", "sha256", "git_sha"):
+        if entry.get(key) not in (None, ""):
+            print(f"{key + ':':<12} {entry[key]}")
+    for key in ("commands", "requires"):
+        if entry.get(key):
+            print(f"{key + ':':<12} {', '.join(entry[key])}")
+    record = _load_registry().get(name)
+    if record:
+        print(f"installed:   yes ({record['repo']} {record.get('branch', DEFAULT_BRANCH)})")
+    else:
+        print("installed:   no")
+
+
+def _index_command(args: List[str]) -> None:
+    if args[:1] == ["build"]:
+        if len(args) != 2:
+            _print_usage()
+            return
+        directory = args[1]
+        packages = _build_index(directory)
+        path = os.path.join(directory, INDEX_NAME)
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump({"version": INDEX_VERSION, "packages": packages}, handle, indent=2, sort_keys=True)
+            handle.write("\n")
+        print(f"Wrote {path} ({len(packages)} packages)")
+        return
+    options = _index_options(args)
+    if options is None:
+        return
+    _positional, repo, branch, refresh = options
+    try:
+        index = _get_index(repo, branch, refresh)
+    except RuntimeError as exc:
+        print(f"pkm index error: {exc}")
+        return
+    age = _format_age(time.time() - index.get("fetched", 0))
+    print(f"{repo} ({branch}): {len(index['packages'])} packages from {index['source']}, fetched {age} ago")
+
+
+def _verify_command() -> Optional[Dict[str, str]]:
+    lock = _load_lock()
+    # Installs made before pkm.lock.json existed are only in the registry.
+    unlocked = sorted(name for name in _load_registry() if name not in lock)
+    if not lock and not unlocked:
+        print("pkm: no pkm.lock.json entries to verify.")
+        return None
+    results = _verify_lock(lock)
+    if lock:
+        _save_lock(lock)
+    drifted = {name: status for name, status in results.items() if status != "ok"}
+    for name, status in sorted(drifted.items()):
+        print(f"{status:<9} {name} ({lock[name]['file']})")
+    for name in unlocked:
+        print(f"unlocked  {name} ({name}.py has no pkm.lock.json entry)")
+    known_files = {entry["file"] for entry in lock.values()} | {f"{name}.py" for name in unlocked}
+    if os.path.isdir(INSTALLED_DIR):
+        for entry in sorted(os.listdir(INSTALLED_DIR)):
+            if entry.endswith(".py") and not entry.startswith("_") and entry not in known_files:
+                print(f"untracked {entry}")
+    summary = f"pkm verify: {len(results) - len(drifted)} ok, {len(drifted)} drifted"
+    if unlocked:
+        summary += f", {len(unlocked)} unlocked (record them with `pkm lock`)"
+    print(summary)
+    return drifted
+
+
+def _lock_command() -> None:
+    registry = _load_registry()
+    lock = _load_lock()
+    names = [
+        name for name in sorted(registry)
+        if name not in lock and os.path.isfile(os.path.join(INSTALLED_DIR, f"{name}.py"))
+    ]
+    if not names:
+        print("pkm: every installed package already has a pkm.lock.json entry.")
+        return
+    _update_lock(names, registry)
+    for name in names:
+        print(f"Locked {name} at its current contents")
+
+
+def _sync_command() -> None:
+    drifted = _verify_command()
+    if not drifted:
+        return
+    lock = _load_lock()
+    registry = _load_registry()
+    packs: Dict[tuple, Set[str]] = {}
+    reinstalled: List[str] = []
+    for name in sorted(drifted):
+        entry = lock[name]
+        branch = entry.get("branch", DEFAULT_BRANCH)
+        try:
+            if entry.get("type") == "zip":
+                pack_name = entry["item"].split(":", 1)[0]
+                packs.setdefault((entry["repo"], pack_name, branch), set()).add(name)
+                continue
+            _install_py(entry["repo"], entry["item"], branch, name_override=name, expected_sha256=entry["sha256"])
+            reinstalled.append(name)
+        except RuntimeError as exc:
+            print(f"pkm sync error: {exc}")
+    # Each pack is downloaded once and only its drifted files are rewritten.
+    for (repo, pack_name, branch), names in packs.items():
+        expected = {name: lock[name]["sha256"] for name in names}
+        try:
+            reinstalled.extend(_install_zip(repo, pack_name, branch, only=names, expected=expected))
+        except RuntimeError as exc:
+            print(f"pkm sync error: {exc}")
+    for name in reinstalled:
+        registry.setdefault(name, {key: lock[name][key] for key in ("repo", "item", "branch", "type")})
+        print(f"Restored {name}")
+    _save_registry(registry)
+    _update_lock(reinstalled, registry)
+
+
 def run(args):
     if not args:
         _print_usage()
@@ -288,6 +788,18 @@ def run(args):
         _remove_command(rest)
     elif action == "list":
         _list_commands()
+    elif action == "search":
+        _search_command(rest)
+    elif action == "info":
+        _info_command(rest)
+    elif action == "index":
+        _index_command(rest)
+    elif action == "verify":
+        _verify_command()
+    elif action == "lock":
+        _lock_command()
+    elif action == "sync":
+        _sync_command()
     elif action == "restart":
         _restart_terminal()
     else:
@@ -9,17 +9,17 @@ def _remove_path(path: str) -> None:
         os.remove(path)
 
 
-def run(args):
+def run(args, ctx):
     if not args:
-        print("Usage: rm <path> [path...]")
+        ctx.write_line("Usage: rm <path> [path...]")
         return
     for target in args:
         expanded = os.path.abspath(target)
-        if not os.path.exists(expanded):
-            print(f"rm: cannot remove '{target}': No such file or directory")
+        if not os.path.lexists(expanded):
+            ctx.error(f"rm: cannot remove '{target}': No such file or directory")
             continue
         try:
             _remove_path(expanded)
-            print(f"Removed: {expanded}")
+            ctx.write_line(f"Removed: {expanded}")
         except Exception as exc:
-            print(f"rm: {exc}")
+            ctx.error(f"rm: {exc}")
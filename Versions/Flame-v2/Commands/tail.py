@@ -0,0 +1,229 @@
+import os
+import select
+import sys
+import time
+from typing import Dict, List, Optional
+
+USAGE = "Usage: tail [-n <lines>] [-f] <file> [file...]"
+DEFAULT_LINES = 10
+BLOCK_SIZE = 64 * 1024
+POLL_MIN = 0.05
+POLL_MAX = 1.0
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+
+def _write(data: bytes) -> None:
+    binary = getattr(sys.stdout, "buffer", None)
+    if binary is not None:
+        binary.write(data)
+        binary.flush()
+    else:
+        sys.stdout.write(data.decode("utf-8", errors="replace"))
+        sys.stdout.flush()
+
+
+def _parse_args(args):
+    count = DEFAULT_LINES
+    follow = False
+    files = []
+    idx = 0
+    while idx < len(args):
+        arg = args[idx]
+        if arg == "-n" and idx + 1 < len(args):
+            count = int(args[idx + 1])
+            idx += 2
+            continue
+        if arg in ("-f", "-F", "--follow"):
+            follow = True
+        elif arg.startswith("-n") and len(arg) > 2:
+            count = int(arg[2:])
+        elif arg.startswith("-") and arg[1:].isdigit():
+            count = int(arg[1:])
+        else:
+            files.append(arg)
+        idx += 1
+    return max(0, count), follow, files
+
+
+def _last_lines(handle, count: int) -> bytes:
+    """Return the last `count` lines by reading backwards from EOF in blocks."""
+    end = handle.seek(0, os.SEEK_END)
+    if count == 0 or end == 0:
+        return b""
+    position = end
+    blocks: List[bytes] = []
+    newlines = 0
+    handle.seek(end - 1)
+    # A trailing newline terminates the last line rather than starting a new one.
+    wanted = count + 1 if handle.read(1) == b"\n" else count
+    while position > 0 and newlines < wanted:
+        size = min(BLOCK_SIZE, position)
+        position -= size
+        handle.seek(position)
+        block = handle.read(size)
+        blocks.append(block)
+        newlines += block.count(b"\n")
+    data = b"".join(reversed(blocks))
+    if newlines >= wanted:
+        cut = len(data)
+        for _ in range(wanted):
+            cut = data.rfind(b"\n", 0, cut)
+        data = data[cut + 1:]
+    return data
+
+
+class _Inotify:
+    """Minimal ctypes binding; None of this is imported unless following."""
+
+    def __init__(self) -> None:
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def watch(self, path: str, mask: int) -> None:
+        self._add_watch(self.fd, os.fsencode(path), mask)
+
+    def wait(self, timeout: float) -> bool:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        try:
+            while os.read(self.fd, 64 * 1024):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class _FollowedFile:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.handle = None
+        self.inode: Optional[int] = None
+        self.position = 0
+
+    def open(self, at_end: bool) -> bool:
+        try:
+            handle = open(self.path, "rb")
+        except OSError:
+            return False
+        if self.handle is not None:
+            self.handle.close()
+        self.handle = handle
+        self.inode = os.fstat(handle.fileno()).st_ino
+        self.position = handle.seek(0, os.SEEK_END) if at_end else 0
+        return True
+
+    def poll(self) -> Optional[bytes]:
+        """Return newly appended bytes, reopening after rotation or truncation."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        if self.handle is None or stat.st_ino != self.inode:
+            if not self.open(at_end=False):
+                return None
+            print(f"tail: '{self.path}' has been replaced; following new file")
+        elif stat.st_size < self.position:
+            print(f"tail: {self.path}: file truncated")
+            self.position = 0
+        if stat.st_size == self.position:
+            return None
+        self.handle.seek(self.position)
+        data = self.handle.read(stat.st_size - self.position)
+        self.position += len(data)
+        return data
+
+    def close(self) -> None:
+        if self.handle is not None:
+            self.handle.close()
+
+
+def _follow(files: List[str]) -> None:
+    followed: Dict[str, _FollowedFile] = {}
+    for path in files:
+        entry = _FollowedFile(os.path.abspath(path))
+        entry.open(at_end=True)
+        followed[path] = entry
+    try:
+        notifier = _Inotify()
+    except (OSError, AttributeError, TypeError):
+        notifier = None
+    watched_inodes: Dict[str, Optional[int]] = {}
+    delay = POLL_MIN
+    last_shown = files[-1]
+    try:
+        while True:
+            if notifier is not None:
+                for path, entry in followed.items():
+                    if watched_inodes.get(path) != entry.inode:
+                        notifier.watch(entry.path, IN_MODIFY | IN_ATTRIB | IN_DELETE_SELF | IN_MOVE_SELF)
+                        notifier.watch(os.path.dirname(entry.path), IN_CREATE | IN_MOVED_TO)
+                        watched_inodes[path] = entry.inode
+                # The timeout is a safety net for events inotify misses (NFS).
+                notifier.wait(POLL_MAX)
+            changed = False
+            for path, entry in followed.items():
+                data = entry.poll()
+                if not data:
+                    continue
+                changed = True
+                if len(files) > 1 and path != last_shown:
+                    _write(f"\n==> {path} <==\n".encode("utf-8"))
+                    last_shown = path
+                _write(data)
+            if notifier is None:
+                # Adaptive polling: quick while the file is busy, backing off when idle.
+                delay = POLL_MIN if changed else min(POLL_MAX, delay * 2)
+                time.sleep(delay)
+    except KeyboardInterrupt:
+        print()
+    finally:
+        if notifier is not None:
+            notifier.close()
+        for entry in followed.values():
+            entry.close()
+
+
+def run(args):
+    try:
+        count, follow, files = _parse_args(args)
+    except ValueError:
+        print(USAGE)
+        return
+    if not files:
+        print(USAGE)
+        return
+    existing = []
+    for position, path in enumerate(files):
+        file_path = os.path.abspath(path)
+        if not os.path.isfile(file_path):
+            print(f"tail: {path}: No such file")
+            continue
+        existing.append(path)
+        if len(files) > 1:
+            _write(f"{'' if position == 0 else chr(10)}==> {path} <==\n".encode("utf-8"))
+        try:
+            with open(file_path, "rb") as handle:
+                _write(_last_lines(handle, count))
+        except OSError as exc:
+            print(f"tail: {exc}")
+    if follow and existing:
+        _follow(existing)
@@ -0,0 +1,11 @@
+import importlib.util
+import os
+
+_LESS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "less.py")
+
+
+def run(args):
+    spec = importlib.util.spec_from_file_location("flame_v2_view_less", _LESS_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)  # type: ignore[attr-defined]
+    return module.run(args)
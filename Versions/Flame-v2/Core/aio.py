@@ -0,0 +1,102 @@
+"""The terminal's persistent asyncio loop for `async def run(args)` commands.
+
+The loop runs forever on its own thread, created on first use, so asyncio is
+never imported by sessions that do not need it. Tasks a command leaves
+behind keep running between prompts. The REPL thread blocks on each
+command's future. Ctrl-C there cancels the command's task and waits briefly
+for it to clean up; the loop and the REPL survive.
+"""
+import threading
+from typing import Any, Awaitable, Optional
+
+CANCEL_GRACE = 2.0
+
+
+async def _guarded(awaitable: Awaitable, finished: threading.Event) -> Any:
+    try:
+        return await awaitable
+    finally:
+        finished.set()
+
+
+class CommandLoop:
+    def __init__(self) -> None:
+        self._loop = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                import asyncio
+
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="flame-asyncio", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def run(self, awaitable: Awaitable, inline: bool = False) -> Any:
+        """Run `awaitable` to completion and return its result.
+
+        With `inline`, the awaitable runs on a temporary loop in the calling
+        thread instead, so that thread-local tools such as cProfile see it.
+        """
+        import asyncio
+
+        if inline:
+            async def _main():
+                return await awaitable
+
+            return asyncio.run(_main())
+        loop = self._ensure_loop()
+        finished = threading.Event()
+        future = asyncio.run_coroutine_threadsafe(_guarded(awaitable, finished), loop)
+        try:
+            return future.result()
+        except KeyboardInterrupt:
+            future.cancel()
+            finished.wait(CANCEL_GRACE)
+            raise
+
+    def pending_tasks(self) -> int:
+        """Number of unfinished tasks on the loop, including background jobs."""
+        if self._loop is None:
+            return 0
+        import asyncio
+
+        async def _count() -> int:
+            return len(asyncio.all_tasks()) - 1
+
+        try:
+            return asyncio.run_coroutine_threadsafe(_count(), self._loop).result(timeout=0.1)
+        except Exception:
+            return 0
+
+    def close(self) -> None:
+        if self._loop is None:
+            return
+        import asyncio
+
+        loop = self._loop
+
+        async def _shutdown() -> None:
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await loop.shutdown_asyncgens()
+
+        try:
+            asyncio.run_coroutine_threadsafe(_shutdown(), loop).result(timeout=CANCEL_GRACE)
+        except Exception:
+            pass
+        loop.call_soon_threadsafe(loop.stop)
+        if self._thread is not None:
+            self._thread.join(CANCEL_GRACE)
+        loop.close()
+        self._loop = None
+        self._thread = None
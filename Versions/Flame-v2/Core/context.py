@@ -0,0 +1,135 @@
+"""Output context handed to commands whose run() accepts a second argument.
+
+    def run(args, ctx):
+        ctx.write_lines(sorted(os.listdir(".")))
+
+The context is detected by the name of run()'s second parameter, so
+existing `run(args, verbose=False)` style signatures are left alone.
+Writes are collected and handed to the real stream in large chunks, so bulk
+output costs a handful of write syscalls instead of one per line on a
+line-buffered TTY. Legacy `run(args)` commands keep using print().
+"""
+import os
+import sys
+from itertools import islice
+from typing import Callable, Iterable, List, Optional, TextIO, Union
+
+FLUSH_THRESHOLD = 64 * 1024
+LINES_PER_CHUNK = 4096
+CONTEXT_PARAMETERS = ("ctx", "context")
+
+Names = Union[List[str], Callable[[], List[str]]]
+
+
+class BufferedWriter:
+    def __init__(self, stream: TextIO, limit: int = FLUSH_THRESHOLD) -> None:
+        self.stream = stream
+        self.limit = limit
+        self._parts: List[str] = []
+        self._size = 0
+
+    def write(self, text: str) -> int:
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= self.limit:
+            self.flush()
+        return len(text)
+
+    def write_lines(self, lines: Iterable[str]) -> None:
+        iterator = iter(lines)
+        while True:
+            chunk = list(islice(iterator, LINES_PER_CHUNK))
+            if not chunk:
+                break
+            self.write("\n".join(chunk) + "\n")
+
+    def flush(self) -> None:
+        if self._parts:
+            self.stream.write("".join(self._parts))
+            self._parts = []
+            self._size = 0
+        self.stream.flush()
+
+    def isatty(self) -> bool:
+        isatty = getattr(self.stream, "isatty", None)
+        return bool(isatty and isatty())
+
+
+class CommandContext:
+    def __init__(
+        self,
+        stdout: Optional[TextIO] = None,
+        stderr: Optional[TextIO] = None,
+        home: str = "",
+        commands: Optional[Names] = None,
+        builtins: Optional[Names] = None,
+        is_tty: Optional[bool] = None,
+    ) -> None:
+        self.stdout = BufferedWriter(stdout or sys.stdout)
+        self.stderr = BufferedWriter(stderr or sys.stderr)
+        self.home = home
+        # Either list may be given as a callable so it is only built for the
+        # few commands that actually look at it.
+        self._commands = commands
+        self._builtins = builtins
+        self.is_tty = self.stdout.isatty() if is_tty is None else is_tty
+
+    @property
+    def commands(self) -> List[str]:
+        if callable(self._commands):
+            self._commands = self._commands()
+        return self._commands or []
+
+    @property
+    def builtins(self) -> List[str]:
+        if callable(self._builtins):
+            self._builtins = self._builtins()
+        return self._builtins or []
+
+    @property
+    def columns(self) -> int:
+        import shutil
+
+        return shutil.get_terminal_size((80, 24)).columns
+
+    def write(self, text: str) -> None:
+        self.stdout.write(text)
+
+    def write_line(self, text: str = "") -> None:
+        self.stdout.write(text + "\n")
+
+    def write_lines(self, lines: Iterable[str]) -> None:
+        self.stdout.write_lines(lines)
+
+    def error(self, text: str) -> None:
+        # Keep stdout and stderr in order when both go to the terminal.
+        self.stdout.flush()
+        self.stderr.write(text + "\n")
+        self.stderr.flush()
+
+    def flush(self) -> None:
+        self.stdout.flush()
+        self.stderr.flush()
+
+
+def accepts_context(runner) -> bool:
+    """True when `runner`'s second positional parameter is named ctx/context."""
+    code = getattr(runner, "__code__", None)
+    if code is None:
+        return False
+    names = code.co_varnames[:code.co_argcount]
+    if getattr(runner, "__self__", None) is not None:
+        names = names[1:]
+    return len(names) >= 2 and names[1] in CONTEXT_PARAMETERS
+
+
+def discover_commands(home: str) -> List[str]:
+    """Command names under `home`'s Commands/ and Installed/, as the registry sees them."""
+    names = set()
+    for folder in ("Commands", "Installed"):
+        try:
+            entries = os.listdir(os.path.join(home, folder))
+        except OSError:
+            continue
+        names.update(entry[:-3] for entry in entries if entry.endswith(".py") and not entry.startswith("_"))
+    return sorted(names)
@@ -0,0 +1,261 @@
+"""Persistent, bounded command history with an indexed search.
+
+Lines are appended to the history file by a background writer thread so the
+REPL never waits on disk, and the file is loaded by a background thread at
+startup. The file is rewritten to the newest `limit` entries once it grows to
+twice that size. Substring and prefix searches go through a HistoryIndex that
+is built on first use and then kept up to date incrementally.
+"""
+import os
+import queue
+import threading
+from bisect import bisect_right
+from typing import Iterator, List, Optional, Tuple
+
+DEFAULT_LIMIT = 10000
+COMPACT_FACTOR = 2
+
+
+class HistoryIndex:
+    """Entries packed into newline-joined text segments for C-speed search.
+
+    Closed segments are single strings searched backwards with `str.rfind`;
+    a bisect over each segment's line offsets maps a hit back to its entry
+    id. Only the newest, still-open segment is scanned line by line.
+    """
+
+    SEGMENT_SIZE = 4096
+
+    def __init__(self, first_id: int = 0) -> None:
+        self._segments: List[Tuple[int, str, List[int]]] = []
+        self._open_first_id = first_id
+        self._open: List[str] = []
+
+    def add(self, text: str) -> None:
+        self._open.append(text)
+        if len(self._open) >= self.SEGMENT_SIZE:
+            self._close_segment()
+
+    def _close_segment(self) -> None:
+        blob = "\n" + "\n".join(self._open) + "\n"
+        starts = []
+        position = 1
+        for line in self._open:
+            starts.append(position)
+            position += len(line) + 1
+        self._segments.append((self._open_first_id, blob, starts))
+        self._open_first_id += len(self._open)
+        self._open = []
+
+    def drop_before(self, entry_id: int) -> None:
+        while self._segments and self._segments[0][0] + len(self._segments[0][2]) <= entry_id:
+            self._segments.pop(0)
+
+    def search(self, query: str, prefix: bool = False) -> Iterator[int]:
+        """Yield ids of matching entries, newest first."""
+        for offset in range(len(self._open) - 1, -1, -1):
+            line = self._open[offset]
+            if line.startswith(query) if prefix else query in line:
+                yield self._open_first_id + offset
+        needle = "\n" + query if prefix else query
+        shift = 1 if prefix else 0
+        for first_id, blob, starts in reversed(self._segments):
+            end = len(blob)
+            while True:
+                hit = blob.rfind(needle, 0, end)
+                if hit < 0:
+                    break
+                line_number = bisect_right(starts, hit + shift) - 1
+                yield first_id + line_number
+                # The previous line's text ends just before this line's "\n".
+                end = starts[line_number] - 1
+
+
+class History:
+    def __init__(self, path: str, limit: int = DEFAULT_LIMIT) -> None:
+        self.path = path
+        self.limit = max(1, limit)
+        self._entries: List[str] = []
+        self._first_id = 0
+        self._index: Optional[HistoryIndex] = None
+        self._lock = threading.Lock()
+        self._loaded = threading.Event()
+        self._pending: List[str] = []
+        self._file_lines = 0
+        # Lines handed to the writer but not yet in the file; they are the
+        # newest entries, so compaction leaves them for the writer to append.
+        self._unwritten = 0
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._load_started = False
+
+    # -- loading and persistence -------------------------------------------
+
+    def load_async(self) -> None:
+        if self._load_started:
+            return
+        self._load_started = True
+        threading.Thread(target=self._load, name="flame-history-load", daemon=True).start()
+
+    def _load(self) -> None:
+        lines: List[str] = []
+        try:
+            with open(self.path, "r", encoding="utf-8", errors="replace") as handle:
+                lines = handle.read().splitlines()
+        except FileNotFoundError:
+            pass
+        except OSError:
+            lines = []
+        with self._lock:
+            self._file_lines = len(lines)
+            self._entries = lines[-self.limit:]
+            self._first_id = 0
+            pending, self._pending = self._pending, []
+            for line in pending:
+                self._append(line)
+            self._loaded.set()
+
+    def wait_loaded(self, timeout: Optional[float] = None) -> bool:
+        self.load_async()
+        return self._loaded.wait(timeout)
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded.is_set()
+
+    def _ensure_writer(self) -> None:
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_loop, name="flame-history-write", daemon=True)
+            self._writer.start()
+
+    def _write_loop(self) -> None:
+        # Appending before the file has been read would make the loader see
+        # this session's lines twice.
+        self._loaded.wait()
+        while True:
+            line = self._queue.get()
+            if line is None:
+                return
+            batch = [line]
+            # Drain whatever else is queued so bursts become a single write.
+            while True:
+                try:
+                    line = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if line is None:
+                    self._write_batch(batch)
+                    return
+                batch.append(line)
+            self._write_batch(batch)
+
+    def _write_batch(self, batch: List[str]) -> None:
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as handle:
+                handle.write("".join(line + "\n" for line in batch))
+            self._file_lines += len(batch)
+        except OSError:
+            pass
+        with self._lock:
+            self._unwritten -= len(batch)
+        if self._loaded.is_set() and self._file_lines >= self.limit * COMPACT_FACTOR:
+            try:
+                self._compact()
+            except OSError:
+                pass
+
+    def _compact(self) -> None:
+        with self._lock:
+            written = self._entries[:max(0, len(self._entries) - self._unwritten)]
+            keep = written[-self.limit:]
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            handle.write("".join(line + "\n" for line in keep))
+        os.replace(tmp_path, self.path)
+        self._file_lines = len(keep)
+
+    def close(self) -> None:
+        """Flush queued writes and stop the writer thread."""
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+
+    # -- entries ---------------------------------------------------------
+
+    def add(self, line: str) -> None:
+        line = line.strip()
+        if not line or "\n" in line:
+            return
+        self.load_async()
+        with self._lock:
+            if not self._loaded.is_set():
+                self._pending.append(line)
+            elif not self._append(line):
+                return
+            self._unwritten += 1
+        self._ensure_writer()
+        self._queue.put(line)
+
+    def _append(self, line: str) -> bool:
+        if self._entries and self._entries[-1] == line:
+            return False
+        self._entries.append(line)
+        if self._index is not None:
+            self._index.add(line)
+        # Trim in chunks so the index is rebuilt rarely.
+        if len(self._entries) > self.limit + max(1, self.limit // 4):
+            drop = len(self._entries) - self.limit
+            del self._entries[:drop]
+            self._first_id += drop
+            if self._index is not None:
+                self._index.drop_before(self._first_id)
+        return True
+
+    def entries(self) -> List[str]:
+        self.wait_loaded()
+        with self._lock:
+            return list(self._entries)
+
+    def tail(self, count: int) -> List[Tuple[int, str]]:
+        self.wait_loaded()
+        with self._lock:
+            start = max(0, len(self._entries) - count)
+            return [(number + 1, self._entries[number]) for number in range(start, len(self._entries))]
+
+    def clear(self) -> None:
+        self.wait_loaded()
+        self.close()
+        with self._lock:
+            self._entries = []
+            self._first_id = 0
+            self._index = None
+            self._file_lines = 0
+            self._unwritten = 0
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    # -- search ----------------------------------------------------------
+
+    def search(self, query: str, limit: int = 50, prefix: bool = False) -> List[Tuple[int, str]]:
+        """Return up to `limit` (number, line) matches, most recent first."""
+        self.wait_loaded()
+        matches = []
+        with self._lock:
+            if self._index is None:
+                self._index = HistoryIndex(self._first_id)
+                for line in self._entries:
+                    self._index.add(line)
+            for entry_id in self._index.search(query, prefix):
+                offset = entry_id - self._first_id
+                if offset < 0:
+                    break
+                matches.append((offset + 1, self._entries[offset]))
+                if len(matches) >= limit:
+                    break
+        return matches
@@ -0,0 +1,174 @@
+"""Memory footprint reporting for the `mem` built-in.
+
+RSS comes from /proc/self/statm where available and falls back to the peak
+reported by `resource`. Allocation sites come from tracemalloc, which is only
+started on request because it slows every allocation down. While tracking is
+on, each in-process command is bracketed by snapshots so its peak and
+retained memory can be attributed to it.
+"""
+import os
+from typing import Dict, List, Optional, Tuple
+
+TRACE_FRAMES = int(os.environ.get("FLAME_V2_TRACEMALLOC_FRAMES", "1"))
+DEFAULT_TOP = 10
+
+
+def _filters() -> list:
+    # Allocations made by tracemalloc itself and by this module's bookkeeping
+    # would otherwise show up at the top of every report.
+    import tracemalloc
+
+    return [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    ]
+
+
+def format_bytes(size: float) -> str:
+    sign = "-" if size < 0 else ""
+    size = abs(size)
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{sign}{size:.0f}{unit}" if unit == "B" else f"{sign}{size:.1f}{unit}"
+        size /= 1024
+    return f"{sign}{size:.1f}GiB"
+
+
+def rss() -> Tuple[Optional[int], str]:
+    """Return (bytes, label): current RSS, or peak RSS where only that is known."""
+    try:
+        with open("/proc/self/statm", "r", encoding="ascii") as handle:
+            resident = int(handle.read().split()[1])
+        return resident * os.sysconf("SC_PAGE_SIZE"), "rss"
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+        import sys
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes.
+        return (peak if sys.platform == "darwin" else peak * 1024), "peak rss"
+    except (ImportError, OSError):
+        return None, "rss"
+
+
+def top_sites(limit: int = DEFAULT_TOP) -> List[str]:
+    """The largest live allocation sites; tracemalloc must already be tracing."""
+    import tracemalloc
+
+    lines = []
+    for stat in tracemalloc.take_snapshot().filter_traces(_filters()).statistics("lineno")[:limit]:
+        frame = stat.traceback[0]
+        lines.append(f"{format_bytes(stat.size):>10}  {stat.count:>7}  {frame.filename}:{frame.lineno}")
+    return lines
+
+
+class CommandMemory:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.peak_max = 0
+        self.retained_total = 0
+        self.retained_last = 0
+
+    def record(self, peak: int, retained: int) -> None:
+        self.calls += 1
+        self.peak_max = max(self.peak_max, peak)
+        self.retained_total += retained
+        self.retained_last = retained
+
+
+class MemoryTracker:
+    """Per-command tracemalloc accounting; every hook is a no-op while disabled."""
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._commands: Dict[str, CommandMemory] = {}
+        self._before = None
+        self._before_size = 0
+        self._last: Optional[Tuple[str, object, object]] = None
+        self._started_tracing = False
+
+    @property
+    def tracing(self) -> bool:
+        import sys
+
+        # Only ask tracemalloc once something has imported it.
+        module = sys.modules.get("tracemalloc")
+        return module is not None and module.is_tracing()
+
+    def enable(self) -> None:
+        import tracemalloc
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+            self._started_tracing = True
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+        self._before = None
+        self._last = None
+        if self._started_tracing:
+            import tracemalloc
+
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def reset(self) -> None:
+        self._commands.clear()
+        self._last = None
+
+    def begin(self) -> None:
+        if not self.enabled:
+            return
+        import tracemalloc
+
+        self._before = tracemalloc.take_snapshot()
+        self._before_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    def end(self, name: str) -> None:
+        if not self.enabled or self._before is None:
+            return
+        import tracemalloc
+
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        entry = self._commands.get(name)
+        if entry is None:
+            entry = self._commands[name] = CommandMemory()
+        entry.record(peak - self._before_size, current - self._before_size)
+        self._last = (name, self._before, after)
+        self._before = None
+
+    def format_table(self) -> List[str]:
+        if not self._commands:
+            return ["No commands measured yet; run `mem track on` first."]
+        header = f"{'command':<16}{'calls':>7}{'peak max':>12}{'retained':>12}{'last':>12}"
+        lines = [header, "-" * len(header)]
+        for name, entry in sorted(self._commands.items(), key=lambda item: item[1].retained_total, reverse=True):
+            lines.append(
+                f"{name:<16}{entry.calls:>7}{format_bytes(entry.peak_max):>12}"
+                f"{format_bytes(entry.retained_total):>12}{format_bytes(entry.retained_last):>12}"
+            )
+        return lines
+
+    def format_diff(self, limit: int = DEFAULT_TOP) -> List[str]:
+        """Allocation sites that grew or shrank across the last measured command."""
+        if self._last is None:
+            return ["No command measured yet; run `mem track on` and then a command."]
+        name, before, after = self._last
+        filters = _filters()
+        stats = after.filter_traces(filters).compare_to(before.filter_traces(filters), "lineno")
+        lines = [f"Allocation changes during `{name}`:"]
+        for stat in [stat for stat in stats if stat.size_diff][:limit]:
+            frame = stat.traceback[0]
+            lines.append(
+                f"{format_bytes(stat.size_diff):>10}  {stat.count_diff:>+7}  {frame.filename}:{frame.lineno}"
+            )
+        if len(lines) == 1:
+            lines.append("  (no retained allocations)")
+        return lines
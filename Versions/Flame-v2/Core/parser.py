@@ -0,0 +1,281 @@
+"""Shell-style command line parsing: quoting, escapes, `$VAR` expansion and globs.
+
+Lexing is memoized per line, since a terminal sees the same lines again and
+again (history recall, `time`, benchmarks). Expansion runs on every call
+because it depends on the environment and on the filesystem.
+
+Glob expansion reads each directory once with `os.scandir` and keeps the
+listing for a short while, checked against the directory's mtime, so `rm build/*.o`
+over thousands of files costs one directory read and one regex per name.
+"""
+import fnmatch
+import os
+import re
+import time
+from functools import lru_cache
+from typing import Dict, List, Mapping, Optional, Pattern, Tuple
+
+LEX_CACHE_SIZE = 512
+LISTING_TTL = 2.0
+LISTING_CACHE_SIZE = 64
+
+# Word parts. Quoted text and variable values are kept apart from bare
+# literal text because only bare text may contain glob patterns.
+LITERAL = "literal"
+QUOTED = "quoted"
+VARIABLE = "variable"
+
+Part = Tuple[str, str]
+Word = Tuple[Part, ...]
+
+GLOB_CHARS = frozenset("*?[")
+DOUBLE_QUOTE_ESCAPES = frozenset('"\\$`')
+_NAME = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_ESCAPED = re.compile(r"\[([*?[])\]")
+
+
+class ParseError(ValueError):
+    pass
+
+
+def _read_variable(line: str, index: int) -> Tuple[Optional[str], int]:
+    """Parse the variable name after a `$` at `index`; return (name, next index)."""
+    if index < len(line) and line[index] == "{":
+        end = line.find("}", index + 1)
+        if end == -1:
+            raise ParseError("missing '}' in variable expansion")
+        name = line[index + 1:end]
+        if not _NAME.fullmatch(name):
+            raise ParseError(f"bad substitution: ${{{name}}}")
+        return name, end + 1
+    match = _NAME.match(line, index)
+    if match is None:
+        return None, index
+    return match.group(), match.end()
+
+
+@lru_cache(maxsize=LEX_CACHE_SIZE)
+def tokenize(line: str) -> Tuple[Word, ...]:
+    """Split `line` into words made of literal, quoted and variable parts."""
+    words: List[Word] = []
+    parts: List[Part] = []
+    text: List[str] = []
+    kind = LITERAL
+    in_word = False
+    index = 0
+    length = len(line)
+
+    def push(new_kind: str) -> None:
+        nonlocal kind
+        if new_kind != kind and text:
+            parts.append((kind, "".join(text)))
+            text.clear()
+        kind = new_kind
+
+    def end_word() -> None:
+        nonlocal in_word
+        push(LITERAL)
+        if text:
+            parts.append((LITERAL, "".join(text)))
+            text.clear()
+        if in_word:
+            words.append(tuple(parts))
+        parts.clear()
+        in_word = False
+
+    while index < length:
+        char = line[index]
+        if char in " \t\n":
+            end_word()
+            index += 1
+            continue
+        in_word = True
+        if char == "\\":
+            if index + 1 >= length:
+                raise ParseError("trailing backslash")
+            push(QUOTED)
+            text.append(line[index + 1])
+            index += 2
+        elif char == "'":
+            end = line.find("'", index + 1)
+            if end == -1:
+                raise ParseError("unterminated single quote")
+            push(QUOTED)
+            parts.append((QUOTED, ""))
+            text.append(line[index + 1:end])
+            index = end + 1
+        elif char == '"':
+            index += 1
+            push(QUOTED)
+            parts.append((QUOTED, ""))
+            while True:
+                if index >= length:
+                    raise ParseError("unterminated double quote")
+                char = line[index]
+                if char == '"':
+                    index += 1
+                    break
+                if char == "\\" and index + 1 < length and line[index + 1] in DOUBLE_QUOTE_ESCAPES:
+                    text.append(line[index + 1])
+                    index += 2
+                elif char == "$":
+                    name, index = _read_variable(line, index + 1)
+                    if name is None:
+                        text.append("$")
+                    else:
+                        push(VARIABLE)
+                        parts.append((VARIABLE, name))
+                        push(QUOTED)
+                else:
+                    text.append(char)
+                    index += 1
+        elif char == "$":
+            name, index = _read_variable(line, index + 1)
+            if name is None:
+                push(LITERAL)
+                text.append("$")
+            else:
+                push(VARIABLE)
+                parts.append((VARIABLE, name))
+                push(LITERAL)
+        else:
+            push(LITERAL)
+            text.append(char)
+            index += 1
+    end_word()
+    return tuple(words)
+
+
+@lru_cache(maxsize=LEX_CACHE_SIZE)
+def _compile(pattern: str) -> Pattern[str]:
+    return re.compile(fnmatch.translate(pattern))
+
+
+def _escape(text: str) -> str:
+    return re.sub(r"([*?[])", r"[\1]", text)
+
+
+def _has_magic(pattern: str) -> bool:
+    return any(char in GLOB_CHARS for char in _ESCAPED.sub("", pattern))
+
+
+class Globber:
+    """Expands glob patterns with a short-lived, mtime-checked listing cache."""
+
+    def __init__(self, ttl: float = LISTING_TTL) -> None:
+        self.ttl = ttl
+        self._listings: Dict[Tuple[int, int], Tuple[float, int, List[Tuple[str, bool]]]] = {}
+
+    def clear(self) -> None:
+        self._listings.clear()
+
+    def listing(self, directory: str) -> List[Tuple[str, bool]]:
+        """Return sorted (name, is_dir) pairs for `directory`, or [] if unreadable."""
+        path = directory or "."
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return []
+        # Keyed by identity, not by the (possibly relative) path, so a cd to a
+        # different directory with the same mtime never reuses a listing.
+        key = (stat.st_dev, stat.st_ino)
+        mtime = stat.st_mtime_ns
+        now = time.monotonic()
+        cached = self._listings.get(key)
+        if cached is not None and cached[1] == mtime and now - cached[0] < self.ttl:
+            return cached[2]
+        try:
+            with os.scandir(path) as entries:
+                names = sorted((entry.name, entry.is_dir()) for entry in entries)
+        except OSError:
+            return []
+        if len(self._listings) >= LISTING_CACHE_SIZE:
+            self._listings = {
+                cached_key: entry for cached_key, entry in self._listings.items() if now - entry[0] < self.ttl
+            }
+        self._listings[key] = (now, mtime, names)
+        return names
+
+    def expand(self, pattern: str) -> List[str]:
+        """Return the sorted paths matching `pattern`; [] when nothing matches."""
+        head, sep, rest = pattern.partition(os.sep) if pattern.startswith(os.sep) else ("", "", pattern)
+        components = rest.split(os.sep)
+        prefixes = [head + sep]
+        for position, component in enumerate(components):
+            last = position == len(components) - 1
+            if not component:
+                prefixes = [prefix + os.sep for prefix in prefixes] if not last else prefixes
+                continue
+            if not _has_magic(component):
+                literal = _ESCAPED.sub(r"\1", component)
+                prefixes = [prefix + literal for prefix in prefixes]
+                if not last:
+                    prefixes = [prefix + os.sep for prefix in prefixes if os.path.isdir(prefix)]
+                else:
+                    prefixes = [prefix for prefix in prefixes if os.path.lexists(prefix)]
+                continue
+            regex = _compile(component)
+            hidden = component.startswith(".")
+            matches = []
+            for prefix in prefixes:
+                for name, is_dir in self.listing(prefix):
+                    if (hidden or not name.startswith(".")) and regex.match(name):
+                        if last:
+                            matches.append(prefix + name)
+                        elif is_dir:
+                            matches.append(prefix + name + os.sep)
+            prefixes = matches
+            if not prefixes:
+                break
+        return prefixes
+
+
+def expand(
+    words: Tuple[Word, ...],
+    environ: Optional[Mapping[str, str]] = None,
+    globber: Optional[Globber] = None,
+) -> List[str]:
+    """Turn lexed words into arguments: substitute variables, `~` and globs.
+
+    A word that only held unquoted variables that expanded to nothing is
+    dropped, as in sh. A glob with no matches is passed through literally.
+    """
+    if environ is None:
+        environ = os.environ
+    args: List[str] = []
+    for word in words:
+        text: List[str] = []
+        pattern: List[str] = []
+        magic = False
+        quoted = False
+        for kind, value in word:
+            if kind == VARIABLE:
+                value = environ.get(value, "")
+                pattern.append(_escape(value))
+            elif kind == QUOTED:
+                quoted = True
+                pattern.append(_escape(value))
+            else:
+                if not text and value.startswith("~") and (len(value) == 1 or value[1] == "/"):
+                    home = os.path.expanduser("~")
+                    pattern.append(_escape(home))
+                    text.append(home)
+                    value = value[1:]
+                if globber is not None and any(char in GLOB_CHARS for char in value):
+                    magic = True
+                pattern.append(value)
+            text.append(value)
+        joined = "".join(text)
+        if not joined and not quoted:
+            continue
+        if magic:
+            matches = globber.expand("".join(pattern))
+            if matches:
+                args.extend(matches)
+                continue
+        args.append(joined)
+    return args
+
+
+def split(line: str, environ: Optional[Mapping[str, str]] = None, globber: Optional[Globber] = None) -> List[str]:
+    return expand(tokenize(line), environ, globber)
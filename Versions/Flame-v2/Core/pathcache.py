@@ -0,0 +1,84 @@
+"""Hashed PATH lookups for running system executables, like bash's `hash`.
+
+Resolved names (and misses) are kept in memory. The whole table is dropped
+when PATH changes or when any PATH directory's mtime changes, which happens
+whenever an executable is added to or removed from that directory.
+"""
+import os
+import sys
+from typing import Dict, List, Optional, Set, Tuple
+
+
+def _is_executable(path: str) -> bool:
+    return os.path.isfile(path) and os.access(path, os.X_OK)
+
+
+class PathHash:
+    def __init__(self) -> None:
+        self._table: Dict[str, str] = {}
+        self._hits: Dict[str, int] = {}
+        self._misses: Set[str] = set()
+        self._path_value: Optional[str] = None
+        self._directories: List[Tuple[str, int]] = []
+
+    def _suffixes(self) -> List[str]:
+        if sys.platform.startswith("win"):
+            return [""] + os.environ.get("PATHEXT", ".COM;.EXE;.BAT;.CMD").lower().split(";")
+        return [""]
+
+    def _snapshot(self, path_value: str) -> List[Tuple[str, int]]:
+        snapshot = []
+        for directory in path_value.split(os.pathsep):
+            directory = directory or "."
+            try:
+                snapshot.append((directory, os.stat(directory).st_mtime_ns))
+            except OSError:
+                snapshot.append((directory, -1))
+        return snapshot
+
+    def _validate(self) -> None:
+        path_value = os.environ.get("PATH", os.defpath)
+        if path_value == self._path_value:
+            snapshot = self._snapshot(path_value)
+            if snapshot == self._directories:
+                return
+        else:
+            snapshot = self._snapshot(path_value)
+        self.reset()
+        self._path_value = path_value
+        self._directories = snapshot
+
+    def reset(self) -> None:
+        self._table.clear()
+        self._hits.clear()
+        self._misses.clear()
+        self._path_value = None
+        self._directories = []
+
+    def forget(self, name: str) -> bool:
+        self._hits.pop(name, None)
+        return self._table.pop(name, None) is not None
+
+    def lookup(self, name: str) -> Optional[str]:
+        """Return the executable for `name`, or None if nothing on PATH matches."""
+        if os.sep in name or (os.altsep and os.altsep in name):
+            return os.path.abspath(name) if _is_executable(name) else None
+        self._validate()
+        path = self._table.get(name)
+        if path is not None:
+            self._hits[name] += 1
+            return path
+        if name in self._misses:
+            return None
+        for directory, _mtime in self._directories:
+            for suffix in self._suffixes():
+                candidate = os.path.join(directory, name + suffix)
+                if _is_executable(candidate):
+                    self._table[name] = os.path.abspath(candidate)
+                    self._hits[name] = 1
+                    return self._table[name]
+        self._misses.add(name)
+        return None
+
+    def entries(self) -> List[Tuple[int, str, str]]:
+        return sorted((self._hits[name], name, path) for name, path in self._table.items())
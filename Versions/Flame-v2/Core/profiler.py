@@ -0,0 +1,93 @@
+"""cProfile plus stack sampling for the `profile` built-in.
+
+The command runs under cProfile on the calling thread while a sampler thread
+records that thread's stacks. The results are written as a `.pstats` file and
+as a `.collapsed` file (one `frame;frame;frame count` line per stack) that
+flamegraph.pl, speedscope and inferno read directly.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, Optional
+
+DEFAULT_INTERVAL = 0.001
+DEFAULT_TOP = 15
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler(threading.Thread):
+    def __init__(self, thread_id: int, root_code, interval: float = DEFAULT_INTERVAL) -> None:
+        super().__init__(name="flame-profile-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.root_code = root_code
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            # Walk up to the profiling entry point so the terminal's own
+            # REPL frames do not appear at the root of every stack.
+            while frame is not None and frame.f_code is not self.root_code:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
+
+    def write_collapsed(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as handle:
+            for stack, count in self.samples.most_common():
+                handle.write(f"{stack} {count}\n")
+
+
+def profile_call(
+    func: Callable[[], object],
+    prefix: str,
+    top: int = DEFAULT_TOP,
+    interval: float = DEFAULT_INTERVAL,
+) -> Dict[str, str]:
+    """Run `func` under cProfile and the stack sampler, then report and save."""
+    import cProfile
+    import pstats
+
+    outputs = {"pstats": f"{prefix}.pstats", "collapsed": f"{prefix}.collapsed"}
+    # Fail before running the command rather than after, when the output
+    # directory cannot be created.
+    os.makedirs(os.path.dirname(os.path.abspath(prefix)), exist_ok=True)
+    sampler = StackSampler(threading.get_ident(), profile_call.__code__, interval)
+    profiler = cProfile.Profile()
+    sampler.start()
+    started = time.perf_counter()
+    profiler.enable()
+    try:
+        func()
+    finally:
+        profiler.disable()
+        elapsed = time.perf_counter() - started
+        sampler.stop()
+
+    print()
+    print(f"profile: {elapsed * 1000:.2f}ms wall, {sum(sampler.samples.values())} stack samples")
+    stats = pstats.Stats(profiler, stream=sys.stdout)
+    stats.strip_dirs().sort_stats("cumulative").print_stats(top)
+    profiler.dump_stats(outputs["pstats"])
+    sampler.write_collapsed(outputs["collapsed"])
+    for kind, path in outputs.items():
+        print(f"profile: wrote {kind} to {os.path.abspath(path)}")
+    return outputs
+
+
+def default_prefix(command_name: str, directory: Optional[str] = None) -> str:
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return os.path.join(directory or os.getcwd(), f"profile-{command_name}-{stamp}")
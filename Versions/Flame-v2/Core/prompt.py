@@ -0,0 +1,242 @@
+"""Prompt segments rendered from a cache, computed off the REPL thread.
+
+Each segment gives a cheap cache `key()` and a possibly slow `compute()`.
+Inline segments are computed on the spot. For the others, a cached value is
+used while its key still matches; once it is older than the segment's ttl it
+is still shown while a background refresh runs. When the key changes (a new
+directory, a commit), the renderer waits at most RENDER_BUDGET for the new
+value, then shows the placeholder and fills the value in at the next prompt.
+"""
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+RENDER_BUDGET = 0.015
+CACHE_SIZE = 64
+COLOR_RESET = "\033[0m"
+
+
+class Segment(ABC):
+    name = "segment"
+    color = ""
+    placeholder = "..."
+    inline = False
+    ttl: Optional[float] = None
+
+    def key(self) -> Hashable:
+        return None
+
+    @abstractmethod
+    def compute(self, key: Hashable) -> str:
+        """Return the segment text for `key`; may be slow unless `inline`."""
+
+
+class CwdSegment(Segment):
+    name = "cwd"
+    color = "\033[34m"
+    inline = True
+
+    def __init__(self, base_dir: str) -> None:
+        self.base_dir = base_dir
+
+    def compute(self, key: Hashable) -> str:
+        cwd_display = os.path.relpath(os.getcwd(), self.base_dir)
+        return "/" if cwd_display == "." else cwd_display
+
+
+def _find_git_dir(directory: str) -> Optional[str]:
+    while True:
+        candidate = os.path.join(directory, ".git")
+        if os.path.isdir(candidate):
+            return candidate
+        if os.path.isfile(candidate):
+            # Worktrees and submodules use a "gitdir: <path>" file.
+            try:
+                with open(candidate, "r", encoding="utf-8") as handle:
+                    target = handle.read().strip().split("gitdir:", 1)[-1].strip()
+                return os.path.normpath(os.path.join(directory, target))
+            except OSError:
+                return None
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+def _mtime(path: str) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+class GitSegment(Segment):
+    name = "git"
+    color = "\033[35m"
+    ttl = 5.0
+
+    def __init__(self) -> None:
+        self._git_dirs: Dict[str, Optional[str]] = {}
+
+    def key(self) -> Hashable:
+        cwd = os.getcwd()
+        if cwd not in self._git_dirs:
+            if len(self._git_dirs) > 256:
+                self._git_dirs.clear()
+            self._git_dirs[cwd] = _find_git_dir(cwd)
+        git_dir = self._git_dirs[cwd]
+        if git_dir is None:
+            return None
+        return cwd, git_dir, _mtime(os.path.join(git_dir, "HEAD")), _mtime(os.path.join(git_dir, "index"))
+
+    def compute(self, key: Hashable) -> str:
+        if key is None:
+            return ""
+        import subprocess
+
+        cwd, git_dir = key[0], key[1]
+        try:
+            with open(os.path.join(git_dir, "HEAD"), "r", encoding="utf-8") as handle:
+                head = handle.read().strip()
+        except OSError:
+            return ""
+        branch = head[len("ref: refs/heads/"):] if head.startswith("ref: refs/heads/") else head[:7]
+        try:
+            status = subprocess.run(
+                ["git", "status", "--porcelain", "--untracked-files=no"],
+                cwd=cwd, capture_output=True, text=True, timeout=2,
+            )
+            dirty = "*" if status.returncode == 0 and status.stdout.strip() else ""
+        except (OSError, subprocess.TimeoutExpired):
+            dirty = ""
+        return f"({branch}{dirty})"
+
+
+class DurationSegment(Segment):
+    name = "duration"
+    color = "\033[33m"
+    inline = True
+    threshold = 0.5
+
+    def __init__(self, last_duration: Callable[[], Optional[float]]) -> None:
+        self.last_duration = last_duration
+
+    def compute(self, key: Hashable) -> str:
+        duration = self.last_duration()
+        if duration is None or duration < self.threshold:
+            return ""
+        if duration >= 60:
+            return f"took {int(duration // 60)}m{int(duration % 60)}s"
+        return f"took {duration:.1f}s"
+
+
+class JobsSegment(Segment):
+    name = "jobs"
+    color = "\033[36m"
+    inline = True
+
+    def __init__(self, count_jobs: Callable[[], int]) -> None:
+        self.count_jobs = count_jobs
+
+    def compute(self, key: Hashable) -> str:
+        jobs = self.count_jobs()
+        return f"jobs:{jobs}" if jobs else ""
+
+
+class PromptRenderer:
+    def __init__(self, segments: List[Segment], budget: float = RENDER_BUDGET) -> None:
+        self.segments = segments
+        self.budget = budget
+        self._cache: "OrderedDict[Tuple[str, Hashable], Tuple[str, float]]" = OrderedDict()
+        self._pending: Dict[Tuple[str, Hashable], object] = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _submit(self, segment: Segment, cache_key: Tuple[str, Hashable]):
+        future = self._pending.get(cache_key)
+        if future is None:
+            if self._executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+
+                self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="flame-prompt")
+            future = self._executor.submit(self._compute, segment, cache_key)
+            self._pending[cache_key] = future
+        return future
+
+    def _compute(self, segment: Segment, cache_key: Tuple[str, Hashable]) -> str:
+        try:
+            value = segment.compute(cache_key[1])
+        except Exception:
+            value = ""
+        with self._lock:
+            self._cache[cache_key] = (value, time.monotonic())
+            self._cache.move_to_end(cache_key)
+            while len(self._cache) > CACHE_SIZE:
+                self._cache.popitem(last=False)
+            self._pending.pop(cache_key, None)
+        return value
+
+    def prefetch(self) -> None:
+        """Start computing uncached segments in the background, e.g. during startup."""
+        pending = []
+        for segment in self.segments:
+            if not segment.inline:
+                key = segment.key()
+                if key is not None:
+                    pending.append((segment, (segment.name, key)))
+        if pending:
+            threading.Thread(target=self._prefetch, args=(pending,), name="flame-prompt-prefetch", daemon=True).start()
+
+    def _prefetch(self, pending: List[Tuple[Segment, Tuple[str, Hashable]]]) -> None:
+        # Import outside the lock so a concurrent render() is not held up.
+        import concurrent.futures  # noqa: F401
+
+        with self._lock:
+            for segment, cache_key in pending:
+                if cache_key not in self._cache:
+                    self._submit(segment, cache_key)
+
+    def render(self) -> List[str]:
+        """Return the coloured, non-empty segment texts in order."""
+        waiting = []
+        values: Dict[str, str] = {}
+        for segment in self.segments:
+            if segment.inline:
+                values[segment.name] = segment.compute(None)
+                continue
+            key = segment.key()
+            if key is None:
+                # Nothing to show here (e.g. not inside a git repository).
+                values[segment.name] = ""
+                continue
+            cache_key = (segment.name, key)
+            with self._lock:
+                cached = self._cache.get(cache_key)
+                if cached is not None:
+                    value, computed_at = cached
+                    values[segment.name] = value
+                    if segment.ttl is not None and time.monotonic() - computed_at > segment.ttl:
+                        self._submit(segment, cache_key)
+                    continue
+                future = self._submit(segment, cache_key)
+            waiting.append((segment, future))
+        # The budget only covers waiting for results, not starting the pool.
+        deadline = time.monotonic() + self.budget
+        for segment, future in waiting:
+            try:
+                values[segment.name] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except Exception:
+                values[segment.name] = segment.placeholder
+        parts = []
+        for segment in self.segments:
+            value = values.get(segment.name, "")
+            if value:
+                parts.append(f"{segment.color}{value}{COLOR_RESET}" if segment.color else value)
+        return parts
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
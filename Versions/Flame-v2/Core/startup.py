@@ -0,0 +1,143 @@
+"""Startup phase timing for Flame v2.
+
+`Terminal.py` marks each startup phase as it happens. `python Terminal.py
+--profile-startup` launches fresh probe processes, reports per-phase timings
+plus an import-time breakdown and optionally fails when the startup budget is
+exceeded.
+"""
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+PROBE_FLAG = "--startup-probe"
+PROBE_PREFIX = "flame-startup:"
+DEFAULT_RUNS = 5
+TOP_IMPORTS = 12
+
+_phases: List[Tuple[str, float]] = []
+_last_mark: Optional[float] = None
+
+
+def begin(started_at: float) -> None:
+    global _last_mark
+    _last_mark = started_at
+
+
+def mark(phase: str) -> None:
+    global _last_mark
+    now = time.perf_counter()
+    if _last_mark is not None:
+        _phases.append((phase, now - _last_mark))
+    _last_mark = now
+
+
+def phases() -> List[Tuple[str, float]]:
+    return list(_phases)
+
+
+def emit_probe() -> None:
+    """Print the recorded phases in a form the parent report can parse."""
+    import json
+
+    print(PROBE_PREFIX + json.dumps(_phases))
+
+
+def _run_probe(terminal_path: str, importtime: bool = False) -> Tuple[float, List[Tuple[str, float]], str]:
+    import json
+    import subprocess
+
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ["-X", "importtime"]
+    cmd += [terminal_path, PROBE_FLAG]
+    started = time.perf_counter()
+    result = subprocess.run(cmd, capture_output=True, text=True, stdin=subprocess.DEVNULL)
+    wall = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"startup probe failed: {result.stderr.strip()}")
+    probe_phases: List[Tuple[str, float]] = []
+    for line in result.stdout.splitlines():
+        if line.startswith(PROBE_PREFIX):
+            probe_phases = [tuple(item) for item in json.loads(line[len(PROBE_PREFIX):])]
+    return wall, probe_phases, result.stderr
+
+
+def _parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """Return (module, self_us, cumulative_us) for top-level imports."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        except ValueError:
+            continue
+        if name.startswith("  "):
+            continue
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    rows.sort(key=lambda row: row[2], reverse=True)
+    return rows
+
+
+def _median(values: List[float]) -> float:
+    ordered = sorted(values)
+    mid = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[mid]
+    return (ordered[mid - 1] + ordered[mid]) / 2
+
+
+def _parse_args(args: List[str]) -> Tuple[int, Optional[float]]:
+    runs = DEFAULT_RUNS
+    budget_env = os.environ.get("FLAME_V2_STARTUP_BUDGET_MS")
+    budget_ms = float(budget_env) if budget_env else None
+    idx = 0
+    while idx < len(args):
+        if args[idx] == "--runs" and idx + 1 < len(args):
+            runs = max(1, int(args[idx + 1]))
+            idx += 2
+        elif args[idx] == "--max-startup-ms" and idx + 1 < len(args):
+            budget_ms = float(args[idx + 1])
+            idx += 2
+        else:
+            idx += 1
+    return runs, budget_ms
+
+
+def report(terminal_path: str, args: List[str]) -> int:
+    """Profile startup of `terminal_path` and return a process exit code."""
+    runs, budget_ms = _parse_args(args)
+    walls: List[float] = []
+    per_phase: Dict[str, List[float]] = {}
+    order: List[str] = []
+    for _ in range(runs):
+        wall, probe_phases, _stderr = _run_probe(terminal_path)
+        walls.append(wall)
+        for name, seconds in probe_phases:
+            if name not in per_phase:
+                per_phase[name] = []
+                order.append(name)
+            per_phase[name].append(seconds)
+    _, _, importtime_log = _run_probe(terminal_path, importtime=True)
+
+    wall_ms = _median(walls) * 1000
+    phase_ms = [(name, _median(per_phase[name]) * 1000) for name in order]
+    in_process_ms = sum(ms for _name, ms in phase_ms)
+    print(f"Flame v2 startup profile (median of {runs} runs)")
+    print(f"  {'interpreter (boot + exit)':<28}{wall_ms - in_process_ms:8.2f} ms")
+    for name, ms in phase_ms:
+        print(f"  {name:<28}{ms:8.2f} ms")
+    print(f"  {'total wall time':<28}{wall_ms:8.2f} ms")
+    print()
+    print(f"Top {TOP_IMPORTS} imports (cumulative, measured with -X importtime):")
+    for name, self_us, cumulative_us in _parse_importtime(importtime_log)[:TOP_IMPORTS]:
+        print(f"  {name:<28}{cumulative_us / 1000:8.2f} ms  (self {self_us / 1000:.2f} ms)")
+
+    if budget_ms is not None:
+        print()
+        if wall_ms > budget_ms:
+            print(f"FAIL: startup took {wall_ms:.2f} ms, budget is {budget_ms:.2f} ms")
+            return 1
+        print(f"OK: startup took {wall_ms:.2f} ms, budget is {budget_ms:.2f} ms")
+    return 0
@@ -0,0 +1,113 @@
+"""Per-command latency counters backing the `stats` and `time` built-ins."""
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+# Only the most recent samples are kept for percentiles so long-running
+# sessions stay bounded in memory.
+SAMPLE_WINDOW = 1024
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class CommandTiming:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.load_total = 0.0
+        self.load_max = 0.0
+        self.run_total = 0.0
+        self.run_max = 0.0
+        self.load_samples: Deque[float] = deque(maxlen=SAMPLE_WINDOW)
+        self.run_samples: Deque[float] = deque(maxlen=SAMPLE_WINDOW)
+
+    def record(self, load: float, run: Optional[float], failed: bool) -> None:
+        self.calls += 1
+        if failed:
+            self.errors += 1
+        self.load_total += load
+        self.load_max = max(self.load_max, load)
+        self.load_samples.append(load)
+        if run is not None:
+            self.run_total += run
+            self.run_max = max(self.run_max, run)
+            self.run_samples.append(run)
+
+    def summary(self) -> Dict[str, float]:
+        runs = list(self.run_samples)
+        loads = list(self.load_samples)
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "load_total_ms": self.load_total * 1000,
+            "load_p50_ms": _percentile(loads, 0.50) * 1000,
+            "load_p95_ms": _percentile(loads, 0.95) * 1000,
+            "load_max_ms": self.load_max * 1000,
+            "run_total_ms": self.run_total * 1000,
+            "run_p50_ms": _percentile(runs, 0.50) * 1000,
+            "run_p95_ms": _percentile(runs, 0.95) * 1000,
+            "run_max_ms": self.run_max * 1000,
+        }
+
+
+class CommandStats:
+    def __init__(self) -> None:
+        self._timings: Dict[str, CommandTiming] = {}
+        self.refresh_total = 0.0
+        self.refresh_count = 0
+
+    def record(self, name: str, load: float, run: Optional[float], failed: bool = False) -> None:
+        timing = self._timings.get(name)
+        if timing is None:
+            timing = self._timings[name] = CommandTiming()
+        timing.record(load, run, failed)
+
+    def record_refresh(self, seconds: float) -> None:
+        self.refresh_total += seconds
+        self.refresh_count += 1
+
+    def reset(self) -> None:
+        self._timings.clear()
+        self.refresh_total = 0.0
+        self.refresh_count = 0
+
+    def as_dict(self) -> Dict[str, Dict]:
+        return {
+            "commands": {name: timing.summary() for name, timing in sorted(self._timings.items())},
+            "refresh": {
+                "count": self.refresh_count,
+                "total_ms": self.refresh_total * 1000,
+            },
+        }
+
+    def to_json(self) -> str:
+        import json
+
+        return json.dumps(self.as_dict(), indent=2)
+
+    def format_table(self) -> List[str]:
+        if not self._timings:
+            return ["No commands recorded yet."]
+        header = (
+            f"{'command':<16}{'calls':>7}{'errors':>7}{'load p50':>10}{'load p95':>10}{'load max':>10}"
+            f"{'run p50':>10}{'run p95':>10}{'run max':>10}"
+        )
+        lines = [header, "-" * len(header)]
+        for name, timing in sorted(self._timings.items(), key=lambda item: item[1].run_total, reverse=True):
+            row = timing.summary()
+            lines.append(
+                f"{name:<16}{row['calls']:>7}{row['errors']:>7}"
+                f"{row['load_p50_ms']:>8.2f}ms{row['load_p95_ms']:>8.2f}ms{row['load_max_ms']:>8.2f}ms"
+                f"{row['run_p50_ms']:>8.2f}ms"
+                f"{row['run_p95_ms']:>8.2f}ms{row['run_max_ms']:>8.2f}ms"
+            )
+        if self.refresh_count:
+            average = self.refresh_total / self.refresh_count * 1000
+            lines.append("")
+            lines.append(f"registry refresh: {self.refresh_count} calls, {average:.2f}ms avg")
+        return lines
@@ -0,0 +1,333 @@
+"""Pre-started worker processes for running plugin commands in isolation.
+
+Workers come from a multiprocessing forkserver (spawn where forkserver is
+unavailable), so each one starts from a small, clean process with this
+module already imported. Every worker preloads the plugin modules it is
+given, and keeps them cached by path and mtime. A command's stdout and
+stderr are streamed back over the worker's pipe as they are written. The
+parent enforces the timeout and replaces workers that time out, die, are
+interrupted or reach `max_runs`. An os.chdir(), sys.exit() or leak inside a
+plugin therefore never reaches the REPL process.
+"""
+import os
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from Core.context import CommandContext, accepts_context, discover_commands
+
+DEFAULT_POOL_SIZE = 2
+DEFAULT_MAX_RUNS = 100
+SPAWN_ATTEMPTS = 3
+STREAM_CHUNK = 4096
+
+
+class WorkerError(Exception):
+    """Raised when an isolated command cannot complete."""
+
+
+# -- worker process side -------------------------------------------------------
+
+
+class _PipeWriter:
+    def __init__(self, conn, channel: str) -> None:
+        self._conn = conn
+        self._channel = channel
+        self._buffer: List[str] = []
+        self._size = 0
+
+    def write(self, text: str) -> int:
+        self._buffer.append(text)
+        self._size += len(text)
+        if "\n" in text or self._size >= STREAM_CHUNK:
+            self.flush()
+        return len(text)
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._conn.send((self._channel, "".join(self._buffer)))
+            self._buffer = []
+            self._size = 0
+
+    def isatty(self) -> bool:
+        return False
+
+
+_modules: Dict[str, Tuple[int, Callable]] = {}
+
+
+def _load_run(path: str) -> Callable:
+    import importlib.util
+
+    mtime = os.stat(path).st_mtime_ns
+    cached = _modules.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    name = os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(f"flame_v2_worker_{name}_{abs(hash(path))}", path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"Unable to load command '{name}'")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)  # type: ignore[attr-defined]
+    run_callable = getattr(module, "run", None)
+    if run_callable is None or not callable(run_callable):
+        raise RuntimeError(f"Command '{name}' is missing a run() function")
+    _modules[path] = (mtime, run_callable)
+    return run_callable
+
+
+def _worker_main(conn, preload: List[str], memory_limit: Optional[int]) -> None:
+    import signal
+
+    # Ctrl-C reaches the whole process group; the parent decides what to kill.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if memory_limit:
+        try:
+            import resource
+
+            resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+        except (ImportError, ValueError, OSError):
+            pass
+    for path in preload:
+        try:
+            _load_run(path)
+        except Exception:
+            pass
+    stdout = _PipeWriter(conn, "out")
+    stderr = _PipeWriter(conn, "err")
+    sys.stdout, sys.stderr = stdout, stderr
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return
+        if message[0] == "stop":
+            return
+        _kind, path, args, cwd, environ, is_tty, builtins = message
+        status, detail, load_time, run_time = "ok", "", 0.0, 0.0
+        started = time.perf_counter()
+        try:
+            os.chdir(cwd)
+            os.environ.clear()
+            os.environ.update(environ)
+            runner = _load_run(path)
+            loaded = time.perf_counter()
+            load_time = loaded - started
+            context = None
+            if accepts_context(runner):
+                home = environ.get("FLAME_V2_HOME", "")
+                context = CommandContext(
+                    stdout,
+                    stderr,
+                    home=home,
+                    commands=lambda: discover_commands(home),
+                    builtins=builtins,
+                    is_tty=is_tty,
+                )
+            try:
+                result = runner(args) if context is None else runner(args, context)
+                if hasattr(result, "__await__"):
+                    import asyncio
+
+                    asyncio.run(result)
+            finally:
+                if context is not None:
+                    context.flush()
+                run_time = time.perf_counter() - loaded
+        except SystemExit as exc:
+            status, detail = "exit", str(exc.code if exc.code is not None else 0)
+        except MemoryError:
+            status, detail = "error", "memory limit exceeded"
+        except Exception:
+            import traceback
+
+            status, detail = "error", traceback.format_exc()
+        stdout.flush()
+        stderr.flush()
+        conn.send(("done", status, detail, load_time, run_time))
+
+
+# -- parent side -----------------------------------------------------------------
+
+
+class _Worker:
+    def __init__(self, process, conn) -> None:
+        self.process = process
+        self.conn = conn
+        self.runs = 0
+
+    def kill(self) -> None:
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(1)
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(("stop",))
+        except OSError:
+            pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(1)
+
+
+class WorkerPool:
+    def __init__(
+        self,
+        preload: Optional[List[str]] = None,
+        size: int = DEFAULT_POOL_SIZE,
+        timeout: Optional[float] = None,
+        memory_limit_mb: Optional[int] = None,
+        max_runs: int = DEFAULT_MAX_RUNS,
+    ) -> None:
+        self.preload = list(preload or [])
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.memory_limit = memory_limit_mb * 1024 * 1024 if memory_limit_mb else None
+        self.max_runs = max(1, max_runs)
+        self._idle: List[_Worker] = []
+        self._cond = threading.Condition()
+        self._spawning = 0
+        self._spawn_failures = 0
+        self._spawn_error = ""
+        self._mp_context = None
+        self._closed = False
+
+    def _get_context(self):
+        if self._mp_context is None:
+            import multiprocessing
+
+            methods = multiprocessing.get_all_start_methods()
+            self._mp_context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            if "forkserver" in methods:
+                self._mp_context.set_forkserver_preload([__name__])
+        return self._mp_context
+
+    def _spawn(self) -> None:
+        try:
+            context = self._get_context()
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=_worker_main,
+                args=(child_conn, self.preload, self.memory_limit),
+                name="flame-worker",
+                daemon=True,
+            )
+            process.start()
+            child_conn.close()
+            worker = _Worker(process, parent_conn)
+            error = ""
+        except Exception as exc:
+            worker = None
+            error = f"{type(exc).__name__}: {exc}"
+        with self._cond:
+            self._spawning -= 1
+            if worker is None:
+                self._spawn_failures += 1
+                self._spawn_error = error
+            if worker is not None and not self._closed:
+                self._idle.append(worker)
+            elif worker is not None:
+                worker.kill()
+            self._cond.notify_all()
+
+    def _replenish(self) -> None:
+        # Called with the condition held.
+        while not self._closed and len(self._idle) + self._spawning < self.size:
+            self._spawning += 1
+            threading.Thread(target=self._spawn, name="flame-worker-spawn", daemon=True).start()
+
+    def start(self) -> None:
+        """Start warming the pool in the background."""
+        with self._cond:
+            self._replenish()
+
+    def busy(self) -> int:
+        with self._cond:
+            return self.size - len(self._idle) - self._spawning
+
+    def _acquire(self) -> _Worker:
+        with self._cond:
+            failures = self._spawn_failures
+            while True:
+                while self._idle:
+                    worker = self._idle.pop()
+                    if worker.process.is_alive():
+                        return worker
+                    if worker.runs == 0:
+                        # Died before it ever ran anything: it failed to start.
+                        self._spawn_failures += 1
+                        self._spawn_error = f"worker exited on startup (code {worker.process.exitcode})"
+                    worker.kill()
+                if self._spawn_failures - failures >= SPAWN_ATTEMPTS:
+                    raise WorkerError(f"unable to start a worker process ({self._spawn_error})")
+                self._replenish()
+                self._cond.wait()
+
+    def _release(self, worker: _Worker, healthy: bool) -> None:
+        worker.runs += 1
+        if not healthy:
+            worker.kill()
+        elif worker.runs >= self.max_runs:
+            threading.Thread(target=worker.stop, name="flame-worker-retire", daemon=True).start()
+            healthy = False
+        with self._cond:
+            if healthy and not self._closed:
+                self._idle.append(worker)
+            self._replenish()
+            self._cond.notify_all()
+
+    def run(
+        self,
+        path: str,
+        args: List[str],
+        on_stdout: Callable[[str], object],
+        on_stderr: Callable[[str], object],
+        timeout: Optional[float] = None,
+        builtins: Optional[List[str]] = None,
+    ) -> Tuple[float, float]:
+        """Run the plugin at `path` in a worker and return (load, run) seconds."""
+        timeout = self.timeout if timeout is None else timeout
+        worker = self._acquire()
+        healthy = False
+        try:
+            worker.conn.send(("run", path, args, os.getcwd(), dict(os.environ), sys.stdout.isatty(), builtins or []))
+            deadline = time.monotonic() + timeout if timeout else None
+            while True:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and (remaining <= 0 or not worker.conn.poll(remaining)):
+                    raise WorkerError(f"timed out after {timeout:g}s")
+                try:
+                    message = worker.conn.recv()
+                except (EOFError, OSError):
+                    worker.process.join(1)
+                    raise WorkerError(f"worker exited unexpectedly (code {worker.process.exitcode})")
+                if message[0] == "out":
+                    on_stdout(message[1])
+                elif message[0] == "err":
+                    on_stderr(message[1])
+                else:
+                    _kind, status, detail, load_time, run_time = message
+                    healthy = True
+                    if status == "error":
+                        raise WorkerError(detail.rstrip())
+                    if status == "exit" and detail not in ("0", "None"):
+                        raise WorkerError(f"exited with status {detail}")
+                    return load_time, run_time
+        except KeyboardInterrupt:
+            raise WorkerError("interrupted")
+        finally:
+            self._release(worker, healthy)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            workers, self._idle = self._idle, []
+        for worker in workers:
+            worker.stop()
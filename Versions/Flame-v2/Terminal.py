@@ -1,22 +1,47 @@
+import time
+
+_STARTUP_T0 = time.perf_counter()
+
 import os
 import sys
-import readline
-import importlib.util
-import traceback
-from typing import Dict, Callable, Optional
+from typing import TYPE_CHECKING, Dict, Callable, List, Optional, Tuple
+
+from Core import startup
+from Core.aio import CommandLoop
+from Core.context import CommandContext, accepts_context
+from Core.history import History
+from Core.parser import Globber, ParseError, split as split_line
+from Core.pathcache import PathHash
+from Core.prompt import CwdSegment, DurationSegment, GitSegment, JobsSegment, PromptRenderer
+from Core.stats import CommandStats
+
+# The profiler, the worker pool and memory tracking are opt-in, so their
+# modules are imported when first used rather than on every start.
+if TYPE_CHECKING:
+    from Core.memory import MemoryTracker
+    from Core.workers import WorkerPool
+
+startup.begin(_STARTUP_T0)
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 COMMANDS_DIR = os.path.join(BASE_DIR, "Commands")
 INSTALLED_DIR = os.path.join(BASE_DIR, "Installed")
+HISTORY_FILE = os.environ.get("FLAME_V2_HISTORY", os.path.join(BASE_DIR, ".flame_history"))
+HISTORY_LIMIT = int(os.environ.get("FLAME_V2_HISTSIZE", "10000"))
+SYSTEM_COMMANDS = os.environ.get("FLAME_V2_SYSTEM_COMMANDS", "1") != "0"
+WORKER_POOL_SIZE = int(os.environ.get("FLAME_V2_WORKERS", "2"))
+WORKER_TIMEOUT = float(os.environ.get("FLAME_V2_TIMEOUT", "0")) or None
+WORKER_MEMORY_MB = int(os.environ.get("FLAME_V2_WORKER_MEMORY_MB", "0")) or None
+WORKER_MAX_RUNS = int(os.environ.get("FLAME_V2_WORKER_RUNS", "100"))
+PROFILE_DIR = os.environ.get("FLAME_V2_PROFILE_DIR", os.path.join(BASE_DIR, "Profiles"))
+PROMPT_SEGMENTS = os.environ.get("FLAME_V2_PROMPT", "git,duration,jobs")
+MEMORY_TRACKING = os.environ.get("FLAME_V2_MEMTRACK", "0") == "1"
 os.environ.setdefault("FLAME_V2_HOME", BASE_DIR)
 
-for required_dir in (COMMANDS_DIR, INSTALLED_DIR):
-    if not os.path.isdir(required_dir):
-        os.makedirs(required_dir, exist_ok=True)
-
 COLOR_RESET = "\033[0m"
 COLOR_FLAME = "\033[38;5;208m"
-COLOR_CWD = "\033[34m"
+
+startup.mark("imports")
 
 
 class CommandError(Exception):
@@ -24,13 +49,14 @@ class CommandError(Exception):
 
 
 class CommandRegistry:
-    def __init__(self) -> None:
+    def __init__(self, directories: Optional[List[str]] = None) -> None:
+        self.directories = directories or [COMMANDS_DIR, INSTALLED_DIR]
         self._paths: Dict[str, str] = {}
         self.refresh()
 
     def refresh(self) -> None:
         self._paths.clear()
-        for directory in (COMMANDS_DIR, INSTALLED_DIR):
+        for directory in self.directories:
             if not os.path.isdir(directory):
                 continue
             for entry in os.listdir(directory):
@@ -43,7 +69,15 @@ class CommandRegistry:
     def available(self):
         return sorted(self._paths.keys())
 
+    def __contains__(self, name: str) -> bool:
+        return name in self._paths
+
+    def path(self, name: str) -> Optional[str]:
+        return self._paths.get(name)
+
     def load(self, name: str) -> Callable[[list], None]:
+        import importlib.util
+
         path = self._paths.get(name)
         if not path:
             raise CommandError(f"Command '{name}' not found")
@@ -65,62 +99,476 @@ class CommandRegistry:
 
 
 class FlameTerminal:
-    def __init__(self) -> None:
-        self.registry = CommandRegistry()
+    def __init__(self, registry: Optional[CommandRegistry] = None, isolate: bool = False) -> None:
+        for required_dir in (COMMANDS_DIR, INSTALLED_DIR):
+            if not os.path.isdir(required_dir):
+                os.makedirs(required_dir, exist_ok=True)
+        self.registry = registry or CommandRegistry()
         self.current_dir = BASE_DIR
         os.chdir(self.current_dir)
+        self.stats = CommandStats()
+        self.path_hash = PathHash()
+        self.globber = Globber()
+        self.memory: Optional["MemoryTracker"] = None
+        if MEMORY_TRACKING:
+            self._memory_tracker().enable()
+        self.async_loop = CommandLoop()
+        self._inline_async = False
+        self.workers: Optional["WorkerPool"] = None
+        if isolate:
+            from Core.workers import WorkerPool
+
+            plugins = [self.registry.path(name) for name in self.registry.available()]
+            self.workers = WorkerPool(
+                preload=[path for path in plugins if path and self._is_plugin(path)],
+                size=WORKER_POOL_SIZE,
+                timeout=WORKER_TIMEOUT,
+                memory_limit_mb=WORKER_MEMORY_MB,
+                max_runs=WORKER_MAX_RUNS,
+            )
+            self.workers.start()
+        self.last_duration: Optional[float] = None
+        self.prompt = PromptRenderer(self._prompt_segments())
+        self.prompt.prefetch()
+        self.history = History(HISTORY_FILE, HISTORY_LIMIT)
+        self.history.load_async()
+        self._history_synced = False
+        self.builtins: Dict[str, Callable[[List[str]], None]] = {
+            "hash": self._builtin_hash,
+            "history": self._builtin_history,
+            "mem": self._builtin_mem,
+            "profile": self._builtin_profile,
+            "stats": self._builtin_stats,
+            "time": self._builtin_time,
+        }
+        self._readline_ready = False
+
+    def init_readline(self) -> None:
+        # Deferred until just before the first prompt: importing readline is
+        # one of the most expensive parts of startup.
+        if self._readline_ready:
+            return
+        import readline
+
         readline.parse_and_bind("tab: complete")
         readline.set_completer(self._completer)
+        self._readline_ready = True
+
+    def _sync_readline_history(self) -> None:
+        # The history file is read in the background; hand it to readline
+        # (for arrow keys and Ctrl-R) at the first prompt after it is ready.
+        if self._history_synced or not self._readline_ready or not self.history.loaded:
+            return
+        import readline
+
+        readline.clear_history()
+        for entry in self.history.entries():
+            readline.add_history(entry)
+        self._history_synced = True
 
     def _completer(self, text: str, state: int) -> Optional[str]:
-        options = [cmd for cmd in self.registry.available() if cmd.startswith(text)]
+        names = sorted(set(self.registry.available()) | set(self.builtins))
+        options = [cmd for cmd in names if cmd.startswith(text)]
         if state < len(options):
             return options[state] + " "
         return None
 
+    def _prompt_segments(self) -> list:
+        available = {
+            "git": GitSegment,
+            "duration": lambda: DurationSegment(lambda: self.last_duration),
+            "jobs": lambda: JobsSegment(self._background_jobs),
+        }
+        segments = [CwdSegment(BASE_DIR)]
+        for name in PROMPT_SEGMENTS.split(","):
+            factory = available.get(name.strip())
+            if factory is not None:
+                segments.append(factory())
+        return segments
+
+    def _background_jobs(self) -> int:
+        jobs = self.async_loop.pending_tasks()
+        if self.workers is not None:
+            jobs += self.workers.busy()
+        return jobs
+
     def format_prompt(self) -> str:
-        cwd_display = os.path.relpath(os.getcwd(), BASE_DIR)
-        if cwd_display == ".":
-            cwd_display = "/"
-        prompt = f"{COLOR_FLAME}flame{COLOR_RESET}:{COLOR_CWD}{cwd_display}{COLOR_RESET} $ "
+        cwd_display, *extras = self.prompt.render()
+        suffix = "".join(f" {extra}" for extra in extras)
+        prompt = f"{COLOR_FLAME}flame{COLOR_RESET}:{cwd_display}{suffix} $ "
         return prompt
 
-    def execute_line(self, line: str) -> None:
-        line = line.strip()
-        if not line:
-            return
-        parts = line.split()
-        command_name, args = parts[0], parts[1:]
+    def make_context(self) -> CommandContext:
+        return CommandContext(
+            home=BASE_DIR,
+            commands=self.registry.available,
+            builtins=lambda: sorted(self.builtins),
+        )
+
+    def _invoke(self, runner: Callable, args: List[str]) -> None:
+        context = self.make_context() if accepts_context(runner) else None
+        try:
+            result = runner(args) if context is None else runner(args, context)
+            # `async def run(args)` commands return a coroutine; drive it on
+            # the terminal's shared event loop.
+            if hasattr(result, "__await__"):
+                self.async_loop.run(result, inline=self._inline_async)
+        finally:
+            if context is not None:
+                context.flush()
+
+    def _is_plugin(self, path: str) -> bool:
+        return os.path.dirname(path) == INSTALLED_DIR
+
+    def run_command(self, command_name: str, args: List[str]) -> Tuple[float, float]:
+        """Load and run a registry command, returning (load, run) seconds."""
+        path = self.registry.path(command_name)
+        if self.workers is not None and path is not None and self._is_plugin(path):
+            return self.run_isolated(command_name, path, args)
+        # Memory is measured around the load too: importing a plugin is often
+        # what a long-running session ends up holding on to.
+        memory = self.memory
+        if memory is not None:
+            memory.begin()
+        started = time.perf_counter()
+        loaded = None
+        failed = False
         try:
             runner = self.registry.load(command_name)
-            runner(args)
+            loaded = time.perf_counter()
+            self._invoke(runner, args)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            finished = time.perf_counter()
+            # Close the memory bracket first so the terminal's own
+            # bookkeeping is not charged to the command.
+            if memory is not None:
+                memory.end(command_name)
+            if loaded is None:
+                # A plugin that cannot even be imported still counts as a failed call.
+                self.stats.record(command_name, finished - started, None, True)
+            else:
+                self.stats.record(command_name, loaded - started, finished - loaded, failed)
+        return loaded - started, finished - loaded
+
+    def run_isolated(self, command_name: str, path: str, args: List[str]) -> Tuple[float, float]:
+        """Run an installed plugin in the worker pool, streaming its output."""
+        from Core.workers import WorkerError
+
+        started = time.perf_counter()
+        load_time = 0.0
+        run_time = None
+        failed = True
+        try:
+            load_time, run_time = self.workers.run(
+                path, args, sys.stdout.write, sys.stderr.write, builtins=sorted(self.builtins)
+            )
+            failed = False
+        except WorkerError as exc:
+            raise CommandError(f"{command_name}: {exc}") from exc
+        finally:
+            sys.stdout.flush()
+            if run_time is None:
+                # Failed or interrupted (e.g. Ctrl-C while waiting for a worker).
+                run_time = time.perf_counter() - started - load_time
+            self.stats.record(command_name, load_time, run_time, failed)
+        return load_time, run_time
+
+    def run_system_command(self, command_name: str, args: List[str]) -> Optional[Tuple[float, float]]:
+        """Run an executable from PATH without a shell, or return None if there is none."""
+        import subprocess
+
+        started = time.perf_counter()
+        executable = self.path_hash.lookup(command_name)
+        if executable is None:
+            return None
+        resolved = time.perf_counter()
+        returncode = 1
+        try:
+            # close_fds=False lets subprocess use posix_spawn where available;
+            # Python opens descriptors non-inheritable, so nothing leaks.
+            process = subprocess.Popen([command_name, *args], executable=executable, close_fds=False)
+            interrupted = False
+            while True:
+                try:
+                    returncode = process.wait()
+                    break
+                except KeyboardInterrupt:
+                    # The child is in our process group and got the same
+                    # SIGINT; like a shell, let it decide whether to exit.
+                    interrupted = True
+            if interrupted:
+                print()
+        except OSError as exc:
+            raise CommandError(f"{command_name}: {exc.strerror or exc}") from exc
+        finally:
+            finished = time.perf_counter()
+            self.stats.record(command_name, resolved - started, finished - resolved, returncode != 0)
+        return resolved - started, finished - resolved
+
+    def _dispatch(self, command_name: str, args: List[str]) -> Optional[Tuple[float, float, float]]:
+        builtin = self.builtins.get(command_name)
+        if builtin is not None:
+            try:
+                builtin(args)
+            except CommandError as err:
+                print(f"Error: {err}")
+            except KeyboardInterrupt:
+                print("^C")
+            except SystemExit:
+                raise
+            except Exception:
+                import traceback
+
+                traceback.print_exc()
+            return None
+        timings = None
+        try:
+            if SYSTEM_COMMANDS and command_name not in self.registry:
+                timings = self.run_system_command(command_name, args)
+                if timings is None:
+                    raise CommandError(f"Command '{command_name}' not found")
+            else:
+                timings = self.run_command(command_name, args)
         except CommandError as err:
             print(f"Error: {err}")
+        except KeyboardInterrupt:
+            print("^C")
         except SystemExit:
             raise
         except Exception:
+            import traceback
+
             traceback.print_exc()
         finally:
+            started = time.perf_counter()
             self.registry.refresh()
+            refresh_time = time.perf_counter() - started
+            self.stats.record_refresh(refresh_time)
+        if timings is None:
+            return None
+        return timings[0], timings[1], refresh_time
+
+    def execute_line(self, line: str) -> None:
+        line = line.strip()
+        if not line:
+            return
+        try:
+            parts = split_line(line, globber=self.globber)
+        except ParseError as err:
+            print(f"Error: {err}")
+            return
+        if not parts:
+            return
+        started = time.perf_counter()
+        try:
+            self._dispatch(parts[0], parts[1:])
+        finally:
+            self.last_duration = time.perf_counter() - started
+
+    def _builtin_time(self, args: List[str]) -> None:
+        if not args:
+            raise CommandError("Usage: time <command> [args...]")
+        started = time.perf_counter()
+        try:
+            timings = self._dispatch(args[0], args[1:])
+        finally:
+            total = time.perf_counter() - started
+            print(f"\nreal {total * 1000:.2f}ms", end="")
+        if timings is not None:
+            load, run, refresh = timings
+            print(f"  (load {load * 1000:.2f}ms, run {run * 1000:.2f}ms, refresh {refresh * 1000:.2f}ms)", end="")
+        print()
+
+    def _builtin_profile(self, args: List[str]) -> None:
+        from Core import profiler
+
+        usage = "Usage: profile [-o <prefix>] [-n <top>] [--interval <ms>] <command> [args...]"
+        prefix = None
+        top = profiler.DEFAULT_TOP
+        interval = profiler.DEFAULT_INTERVAL
+        idx = 0
+        try:
+            while idx < len(args) and args[idx].startswith("-"):
+                if args[idx] == "-o" and idx + 1 < len(args):
+                    prefix = args[idx + 1]
+                elif args[idx] == "-n" and idx + 1 < len(args):
+                    top = int(args[idx + 1])
+                elif args[idx] == "--interval" and idx + 1 < len(args):
+                    interval = float(args[idx + 1]) / 1000
+                else:
+                    raise CommandError(usage)
+                idx += 2
+        except ValueError as exc:
+            raise CommandError(usage) from exc
+        if idx >= len(args):
+            raise CommandError(usage)
+        command_name, command_args = args[idx], args[idx + 1:]
+        prefix = prefix or profiler.default_prefix(command_name, PROFILE_DIR)
+        # Async commands normally run on the loop thread, where cProfile and
+        # the sampler cannot see them; run them inline while profiling.
+        self._inline_async = True
+        try:
+            profiler.profile_call(lambda: self._dispatch(command_name, command_args), prefix, top, interval)
+        except OSError as exc:
+            raise CommandError(f"profile: {exc.filename or prefix}: {exc.strerror or exc}") from exc
+        finally:
+            self._inline_async = False
+
+    def _builtin_hash(self, args: List[str]) -> None:
+        if not args:
+            entries = self.path_hash.entries()
+            if not entries:
+                print("hash: hash table empty")
+                return
+            print("hits    command")
+            for hits, _name, path in entries:
+                print(f"{hits:>4}    {path}")
+        elif args == ["-r"]:
+            self.path_hash.reset()
+        elif args[0] == "-d" and len(args) > 1:
+            for name in args[1:]:
+                if not self.path_hash.forget(name):
+                    print(f"hash: {name}: not found")
+        elif not args[0].startswith("-"):
+            for name in args:
+                if self.path_hash.lookup(name) is None:
+                    print(f"hash: {name}: not found")
+        else:
+            raise CommandError("Usage: hash [-r] [-d name...] [name...]")
+
+    def _builtin_history(self, args: List[str]) -> None:
+        usage = "Usage: history [count] | history -s <text> | history -p <prefix> | history -c"
+        if not args:
+            rows = self.history.tail(20)
+        elif args[0] == "-c" and len(args) == 1:
+            self.history.clear()
+            if self._readline_ready:
+                import readline
+
+                readline.clear_history()
+            print("History cleared.")
+            return
+        elif args[0] in ("-s", "-p") and len(args) > 1:
+            query = " ".join(args[1:])
+            rows = list(reversed(self.history.search(query, prefix=args[0] == "-p")))
+        elif len(args) == 1 and args[0].isdigit():
+            rows = self.history.tail(int(args[0]))
+        else:
+            raise CommandError(usage)
+        for number, entry in rows:
+            print(f"{number:>6}  {entry}")
+
+    def _memory_tracker(self) -> "MemoryTracker":
+        if self.memory is None:
+            from Core.memory import MemoryTracker
+
+            self.memory = MemoryTracker()
+        return self.memory
+
+    def _builtin_mem(self, args: List[str]) -> None:
+        from Core.memory import format_bytes, rss, top_sites
+
+        memory = self._memory_tracker()
+        usage = "Usage: mem [top [n] | track on|off | report | diff [n] | reset]"
+        count = int(args[1]) if len(args) == 2 and args[1].isdigit() else 10
+        if not args:
+            size, label = rss()
+            print(f"{label}: {format_bytes(size) if size is not None else 'unavailable'}")
+            if not memory.tracing:
+                print("tracemalloc: off (`mem track on` to measure each command)")
+                return
+            import tracemalloc
+
+            current, peak = tracemalloc.get_traced_memory()
+            print(f"traced: {format_bytes(current)} (peak {format_bytes(peak)})")
+            print()
+            for row in top_sites(count):
+                print(row)
+        elif args[0] == "top" and len(args) <= 2:
+            if not memory.tracing:
+                raise CommandError("tracemalloc is off; run `mem track on` first")
+            for row in top_sites(count):
+                print(row)
+        elif args[:1] == ["track"] and len(args) == 2 and args[1] in ("on", "off"):
+            if args[1] == "on":
+                memory.enable()
+                print("Measuring memory per command (tracemalloc on).")
+            else:
+                memory.disable()
+                print("Memory tracking off.")
+        elif args == ["report"]:
+            for row in memory.format_table():
+                print(row)
+        elif args[0] == "diff" and len(args) <= 2:
+            for row in memory.format_diff(count):
+                print(row)
+        elif args == ["reset"]:
+            memory.reset()
+            print("Memory statistics cleared.")
+        else:
+            raise CommandError(usage)
+
+    def _builtin_stats(self, args: List[str]) -> None:
+        if not args:
+            for row in self.stats.format_table():
+                print(row)
+        elif args[0] == "reset":
+            self.stats.reset()
+            print("Command statistics cleared.")
+        elif args[0] == "--json":
+            payload = self.stats.to_json()
+            if len(args) > 1:
+                try:
+                    with open(args[1], "w", encoding="utf-8") as handle:
+                        handle.write(payload + "\n")
+                except OSError as exc:
+                    raise CommandError(f"stats: {args[1]}: {exc.strerror or exc}") from exc
+                print(f"Wrote command statistics to {os.path.abspath(args[1])}")
+            else:
+                print(payload)
+        else:
+            raise CommandError("Usage: stats [reset | --json [file]]")
 
     def loop(self) -> None:
-        while True:
-            try:
-                line = input(self.format_prompt())
-            except EOFError:
-                print()
-                break
-            except KeyboardInterrupt:
-                print()
-                continue
-            try:
-                self.execute_line(line)
-            except SystemExit:
-                break
+        self.init_readline()
+        try:
+            while True:
+                self._sync_readline_history()
+                try:
+                    line = input(self.format_prompt())
+                except EOFError:
+                    print()
+                    break
+                except KeyboardInterrupt:
+                    print()
+                    continue
+                self.history.add(line)
+                try:
+                    self.execute_line(line)
+                except SystemExit:
+                    break
+        finally:
+            self.history.close()
+            self.async_loop.close()
+            self.prompt.close()
+            if self.workers is not None:
+                self.workers.close()
 
 
 def main() -> None:
-    terminal = FlameTerminal()
+    if "--profile-startup" in sys.argv[1:]:
+        sys.exit(startup.report(os.path.abspath(__file__), sys.argv[1:]))
+    isolate = "--isolate" in sys.argv[1:] or os.environ.get("FLAME_V2_ISOLATE") == "1"
+    terminal = FlameTerminal(isolate=isolate)
+    startup.mark("registry scan")
+    terminal.init_readline()
+    startup.mark("readline init")
+    if startup.PROBE_FLAG in sys.argv[1:]:
+        startup.emit_probe()
+        return
     terminal.loop()
 
 